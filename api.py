@@ -0,0 +1,201 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+import backend
+import metrics
+import startup_profile
+
+load_dotenv()
+
+# Micro-batching settings (override through the environment / .env)
+MAX_BATCH_SIZE = int(os.getenv("API_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("API_MAX_WAIT_MS", "5"))
+MAX_REQUEST_ITEMS = int(os.getenv("API_MAX_REQUEST_ITEMS", "10000"))
+
+
+class PredictRequest(BaseModel):
+    text: str
+
+
+class BatchPredictRequest(BaseModel):
+    texts: List[str]
+
+
+class Prediction(BaseModel):
+    label: str
+    confidence: float
+    tier: Optional[str] = None  # cascade tier that answered (SENTIMENT_MODEL=cascade)
+
+
+class BatchPrediction(BaseModel):
+    results: List[Prediction]
+    model_version: str
+
+
+class SentencePrediction(Prediction):
+    text: str
+    weight: int
+
+
+class DocumentPrediction(BaseModel):
+    label: str
+    confidence: float
+    sentences: List[SentencePrediction]
+    model_version: str
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single predictions into one vectorized call.
+    A batch is flushed once it holds max_batch_size items or the oldest
+    item has waited max_wait_ms, whichever comes first. Without a fixed
+    model every batch leases the serving model (see backend.serving_model).
+    """
+
+    def __init__(self, model=None, vectorizer=None, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def score(self, texts):
+        """Returns (results, model_version) for one vectorized batch."""
+        # Explicit batches are already vectorized; just keep them off the event loop.
+        return await asyncio.to_thread(self._score, texts)
+
+    def _score(self, texts):
+        if self.model is not None:
+            return self._predict(texts, self.model, self.vectorizer)
+        with backend.serving_model() as (model, vectorizer):
+            return self._predict(texts, model, vectorizer)
+
+    @staticmethod
+    def _predict(texts, model, vectorizer):
+        results = backend.predict_sentiment_batch(texts, model, vectorizer, log=True, with_tier=True)
+        return results, backend.model_version_of(model)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            text, future = await self.queue.get()
+            batch = [(text, future)]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [t for t, _ in batch]
+            try:
+                results, _ = await self.score(texts)
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+                continue
+
+            for (_, f), result in zip(batch, results):
+                if not f.done():
+                    f.set_result(result)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model once per process; batches lease it so registry hot-swaps apply without a restart
+    backend.get_backend()
+    startup_profile.report()
+    app.state.batcher = MicroBatcher()
+    app.state.batcher.start()
+    yield
+    await app.state.batcher.stop()
+
+
+app = FastAPI(title="Urdu Sentiment API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    with backend.serving_model() as (model, _):
+        return {"status": "ok", "model_version": backend.model_version_of(model)}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return metrics.render()
+
+
+@app.get("/cache")
+async def cache_info():
+    return backend.prediction_cache.info()
+
+
+@app.get("/registry")
+async def registry_info():
+    registry = backend.get_registry() if backend.SENTIMENT_MODEL == "registry" else None
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Not serving from a model registry")
+    return registry.info()
+
+
+@app.post("/predict", response_model=Prediction)
+async def predict(req: PredictRequest):
+    label, confidence, tier = await app.state.batcher.submit(req.text)
+    return Prediction(label=label, confidence=confidence, tier=tier)
+
+
+@app.post("/predict/batch", response_model=BatchPrediction)
+async def predict_batch(req: BatchPredictRequest):
+    if len(req.texts) > MAX_REQUEST_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_REQUEST_ITEMS} texts per request")
+
+    results, model_version = await app.state.batcher.score(req.texts)
+    return BatchPrediction(
+        results=[Prediction(label=l, confidence=c, tier=t) for l, c, t in results],
+        model_version=model_version,
+    )
+
+
+@app.post("/predict/document", response_model=DocumentPrediction)
+async def predict_document(req: PredictRequest):
+    def score():
+        with backend.serving_model() as (model, vectorizer):
+            return backend.predict_document(req.text, model, vectorizer, log=True), backend.model_version_of(model)
+
+    # One vectorized call for every sentence, kept off the event loop
+    doc, model_version = await asyncio.to_thread(score)
+    return DocumentPrediction(**doc, model_version=model_version)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("api:app", host=os.getenv("API_HOST", "0.0.0.0"), port=int(os.getenv("API_PORT", "8000")))
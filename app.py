@@ -1,18 +1,10 @@
 import streamlit as st
-from db import supabase_public
 
 # --- 0. Set Global Config (Must be first) ---
 if "user" not in st.session_state:
     st.session_state.user = None
 
-# Restore session from Supabase client if available (fixes refresh logout)
-if st.session_state.user is None:
-    try:
-        session = supabase_public.auth.get_session()
-        if session:
-            st.session_state.user = session.user
-    except:
-        pass
+# Set by the admin page's login for this browser session only (see auth.py)
 
 admin_title = "Admin"
 if st.session_state.user:
@@ -29,14 +21,11 @@ st.set_page_config(
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = {}  # {chat_id: {"title": str, "messages": list}}
-    
 if "current_chat_id" not in st.session_state:
-    st.session_state.current_chat_id = None
-    
-if "chat_counter" not in st.session_state:
-    st.session_state.chat_counter = 0
+    st.session_state.current_chat_id = None  # None until the new chat's first message is stored
+
+if "saved_count" not in st.session_state:
+    st.session_state.saved_count = 0  # messages of the current chat already in the chat store
 
 # --- 2. Navigation Setup ---
 # Using file-based pages for robust switching
@@ -1,5 +1,5 @@
 import streamlit as st
-from db import supabase_public, supabase_admin
+from db import get_admin_client, new_public_client
 
 #def login(email, password):
    # res = supabase_public.auth.sign_in_with_password({
@@ -9,8 +9,18 @@ from db import supabase_public, supabase_admin
     #if not res.session:
     #    raise Exception("Invalid credentials or email not verified")
     #    #return res
+def _auth_client():
+    """
+    Anon-key client of this browser session. Signing in on the process-wide
+    client would hand the session to every other visitor of this server.
+    """
+    if st.session_state.get("auth_client") is None:
+        st.session_state.auth_client = new_public_client()
+    return st.session_state.auth_client
+
+
 def login(email, password):
-    res = supabase_public.auth.sign_in_with_password({
+    res = _auth_client().auth.sign_in_with_password({
         "email": email,
         "password": password
     })
@@ -21,19 +31,19 @@ def login(email, password):
 def signup(email, password):
     try:
         # Attempt to create user with auto-confirmation using admin client
-        return supabase_admin.auth.admin.create_user({
+        return get_admin_client().auth.admin.create_user({
             "email": email,
             "password": password,
             "email_confirm": True
         })
     except Exception as e:
         print(f"Admin signup failed: {e}")
-        return supabase_public.auth.sign_up({
+        return _auth_client().auth.sign_up({
             "email": email,
             "password": password
         })
     
 
 def logout():
-    supabase_public.auth.sign_out()
+    _auth_client().auth.sign_out()
     st.session_state.clear()
@@ -1,92 +1,290 @@
-import re
+import os
+import json
+import time
+import random
 import pickle
+import logging
+import threading
+from contextlib import contextmanager
 import numpy as np
-import os
-from db import supabase_admin
+import metrics
+from prediction_logger import get_logger
+from prediction_cache import prediction_cache, CACHE_LOG_HITS
+from urdu_text import clean_urdu_text, clean_urdu_texts, split_urdu_sentences
+from startup_profile import timed
+
+metrics.gauge("sentiment_cache_hits", "Prediction cache hits", lambda: prediction_cache.stats["hits"])
+metrics.gauge("sentiment_cache_misses", "Prediction cache misses", lambda: prediction_cache.stats["misses"])
+metrics.gauge("sentiment_cache_evictions", "Prediction cache evictions", lambda: prediction_cache.stats["evictions"])
 
 MODEL_VERSION = "v3.1_UrduSentiment_Final"
 
+# Fraction of predictions written to the structured debug log
+DEBUG_SAMPLE_RATE = float(os.getenv("DEBUG_SAMPLE_RATE", "0.01"))
+logger = logging.getLogger("backend")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    # Own handler: don't print every line a second time through the root logger
+    logger.propagate = False
+
 # Constants
 MODEL_PATH = "svm_model.pkl"
 TOKENIZER_PATH = "tfidf_vectorizer.pkl"
+LINEAR_MODEL_DIR = "linear_model"  # see linear_artifact.py
 
-def clean_urdu_text(text):
-    """
-    Cleans Urdu text by removing English letters, digits, and special chars.
-    Keeps Urdu/Arabic letters and spaces.
-    """
-    if not isinstance(text, str):
-        text = str(text)
-    
-    # Remove English alphanumeric characters
-    text = re.sub(r'[a-zA-Z0-9]', '', text)
-    
-    # Keep only Arabic/Urdu unicode range and spaces. 
-    # \u0600-\u06FF includes base Arabic/Urdu chars.
-    text = re.sub(r'[^\u0600-\u06FF\s]', '', text)
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+# Which model serves predictions: "linear" (TF-IDF + LogReg), "bilstm" (see bilstm_engine.py),
+# "cascade" (linear first, BiLSTM below CASCADE_THRESHOLD confidence; see cascade.py) or
+# "registry" (current version in MODEL_REGISTRY_DIR, hot-swapped; see model_registry.py).
+# Defaults to "registry" when a registry manifest exists, "linear" otherwise.
+SENTIMENT_MODEL = (os.getenv("SENTIMENT_MODEL") or (
+    "registry" if os.path.exists(os.path.join(os.getenv("MODEL_REGISTRY_DIR", "models"), "registry.json")) else "linear"
+)).lower()
+
+_backends = {}
+_backend_lock = threading.RLock()
 
 def initialize_backend():
     """
     Loads the verified Logistic Regression model and TF-IDF vectorizer.
     This model has been tested to correctly handle positive/negative Urdu text.
+    Prefers the memory-mapped export in LINEAR_MODEL_DIR (no pickle, no
+    scikit-learn import); the legacy pickles are only a fallback.
     """
     print("Loading resources...")
-    
+
+    if os.path.exists(os.path.join(LINEAR_MODEL_DIR, "manifest.json")):
+        # Imported here so that importing backend does not pull in SciPy
+        from linear_artifact import load_linear_model
+        with timed("model load (memory-mapped)"):
+            model, vectorizer = load_linear_model(LINEAR_MODEL_DIR)
+        print("Backend initialized successfully (LogReg, memory-mapped).")
+        return model, vectorizer
+
     if not os.path.exists(MODEL_PATH):
         # We need to ensure these exist. If they were deleted, we retrain.
         print("Model files missing. Please ensure svm_model.pkl exists.")
         raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
-        
-    with open(MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    with open(TOKENIZER_PATH, 'rb') as f:
-        vectorizer = pickle.load(f)
+
+    print(f"Warning: {LINEAR_MODEL_DIR}/ not found, unpickling {MODEL_PATH}. "
+          f"Run 'python linear_artifact.py' to export a pickle-free model.")
+    with timed("model load (pickle)"):
+        with open(MODEL_PATH, 'rb') as f:
+            model = pickle.load(f)
+        with open(TOKENIZER_PATH, 'rb') as f:
+            vectorizer = pickle.load(f)
         
     print("Backend initialized successfully (LogReg).")
     return model, vectorizer
 
-def log_prediction(review, prediction, confidence):
-    try:
-        supabase_admin.table("sentiment_logs").insert({
-            "review": review,
-            "prediction": prediction,
-            "confidence": float(confidence),
-            "model_version": MODEL_VERSION
-        }).execute()
-    except Exception as e:
-        print(f"Warning: Failed to log prediction to database: {e}")
+def initialize_bilstm_backend():
+    """
+    Loads the length-bucketed TFLite BiLSTM and its tokenizer.
+    The pair plugs into predict_sentiment_batch like (model, vectorizer).
+    """
+    print("Loading resources...")
+    # Imported here so that the linear path never loads the TFLite runtime
+    from bilstm_engine import load_bilstm
+    model, tokenizer = load_bilstm()
+    print("Backend initialized successfully (BiLSTM, TFLite).")
+    return model, tokenizer
 
 
-def predict_sentiment(text, model, vectorizer):
+def initialize_cascade_backend():
     """
-    Predicts sentiment using the stable LogReg model.
+    Builds the linear -> BiLSTM cascade from the two (cached) backends.
     """
-    cleaned_text = clean_urdu_text(text)
-    if not cleaned_text:
-        return "Neutral", 0.0
-        
-    # Vectorize
-    vectors = vectorizer.transform([cleaned_text])
-    
-    # Predict Probabilities
-    probs = model.predict_proba(vectors)[0] 
-    prediction = model.predict(vectors)[0] 
-    
+    from cascade import CascadeModel, PassthroughVectorizer
+    fast, fast_vectorizer = get_backend("linear")
+    slow, slow_tokenizer = get_backend("bilstm")
+    model = CascadeModel(fast, fast_vectorizer, slow, slow_tokenizer,
+                         versions=(model_version_of(fast), model_version_of(slow)))
+    print(f"Cascade ready (BiLSTM below {model.threshold:g} confidence).")
+    return model, PassthroughVectorizer()
+
+
+_initializers = {
+    "linear": initialize_backend,
+    "bilstm": initialize_bilstm_backend,
+    "cascade": initialize_cascade_backend,
+    "registry": None,  # never cached here: the registry swaps versions itself
+}
+
+
+def get_registry():
+    """The process-wide ModelRegistry, or None without a registry manifest."""
+    from model_registry import get_registry as _get_registry
+    return _get_registry()
+
+
+def get_backend(kind=None):
+    """
+    Returns the process-wide (model, vectorizer) for kind ("linear",
+    "bilstm" or "cascade", default SENTIMENT_MODEL), loading it on first use.
+    """
+    kind = (kind or SENTIMENT_MODEL).lower()
+    if kind not in _initializers:
+        raise ValueError(f"Unknown SENTIMENT_MODEL '{kind}', expected one of {', '.join(_initializers)}")
+    if kind == "registry":
+        registry = get_registry()
+        if registry is None:
+            raise FileNotFoundError("SENTIMENT_MODEL=registry but no model registry manifest was found")
+        # A snapshot: long-lived callers should use serving_model() to follow hot-swaps
+        handle = registry.current
+        return handle.model, handle.vectorizer
+    if kind not in _backends:
+        # Re-entrant: the cascade loads its tiers through get_backend
+        with _backend_lock:
+            if kind not in _backends:
+                _backends[kind] = _initializers[kind]()
+    return _backends[kind]
+
+
+@contextmanager
+def serving_model(kind=None):
+    """
+    Yields the (model, vectorizer) to score one request with.
+    With the registry the pair is leased: a hot-swap during the request
+    keeps this version alive until the block exits.
+    """
+    if (kind or SENTIMENT_MODEL).lower() == "registry" and get_registry() is not None:
+        with get_registry().lease() as handle:
+            yield handle.model, handle.vectorizer
+    else:
+        yield get_backend(kind)
+
+
+def model_version_of(model):
+    """Version string used for caching and logging predictions of model."""
+    return getattr(model, "model_version", None) or MODEL_VERSION
+
+
+def _score_cleaned(cleaned, model, vectorizer):
+    """
+    Runs the model once over a list of already-cleaned, non-empty texts.
+    Returns (label, confidence, tier) per text; tier is only set by a cascade.
+    """
+    start = time.perf_counter()
+    vectors = vectorizer.transform(cleaned)
+    vectorized = time.perf_counter()
+    if hasattr(model, "predict_proba_tiers"):
+        probs, tiers = model.predict_proba_tiers(vectors)
+    else:
+        probs, tiers = model.predict_proba(vectors), [None] * len(cleaned)
+    metrics.stage_latency.observe(vectorized - start, "vectorize")
+    metrics.stage_latency.observe(time.perf_counter() - vectorized, "model")
+    classes = getattr(model, "classes_", np.arange(probs.shape[1]))
+
     # Mapping: 0 -> Negative, 1 -> Positive (as verified in training)
-    if prediction == 1:
-        label = "Positive"
-        confidence = probs[1]
+    best = np.argmax(probs, axis=1)
+    conf = probs[np.arange(len(cleaned)), best]
+    positive = np.asarray(classes)[best] == 1
+    return [
+        ("Positive" if pos else "Negative", float(c), tier)
+        for pos, c, tier in zip(positive, conf, tiers)
+    ]
+
+
+def predict_sentiment_batch(texts, model, vectorizer, log=False, use_cache=True, with_tier=False):
+    """
+    Scores a list of texts in one vectorized pass.
+    Cleans every text, looks the cleaned texts up in the prediction cache and
+    runs the model once over the distinct misses; labels come from the argmax.
+    Empty inputs get ("Neutral", 0.0). Results are returned in input order.
+    With log=True the scored texts are queued for sentiment_logs (cache hits
+    only when CACHE_LOG_HITS is set). With with_tier=True every result is
+    (label, confidence, tier), tier naming the cascade tier that answered.
+    """
+    start = time.perf_counter()
+    cleaned = clean_urdu_texts(texts)
+    width = 3 if with_tier else 2
+    results = [("Neutral", 0.0, None)[:width]] * len(cleaned)
+    metrics.stage_latency.observe(time.perf_counter() - start, "clean")
+    metrics.batches_total.inc()
+
+    idx = [i for i, c in enumerate(cleaned) if c]
+    if len(idx) < len(cleaned):
+        empty = len(cleaned) - len(idx)
+        metrics.empty_inputs_total.inc(amount=empty)
+        metrics.predictions_total.inc("Neutral", amount=empty)
+    if not idx:
+        metrics.stage_latency.observe(time.perf_counter() - start, "total")
+        return results
+
+    keys = [cleaned[i] for i in idx]
+    version = model_version_of(model)
+    if use_cache:
+        cached = prediction_cache.get_many(keys, version)
     else:
-        label = "Negative"
-        confidence = probs[0]
-        
-    print(f"DEBUG: Input='{text}' | Label={label} | Score={confidence:.4f}")
-    log_prediction(text, label, confidence)
-    return label, float(confidence)
+        cached = [None] * len(keys)
+
+    missing = list(dict.fromkeys(k for k, hit in zip(keys, cached) if hit is None))
+    scored = {}
+    if missing:
+        scored = dict(zip(missing, _score_cleaned(missing, model, vectorizer)))
+        if use_cache:
+            prediction_cache.put_many(scored.items(), version)
+
+    to_log = []
+    positives = 0
+    for i, key, hit in zip(idx, keys, cached):
+        value = hit if hit is not None else scored[key]
+        results[i] = value[:width]
+        positives += value[0] == "Positive"
+        if log and (hit is None or CACHE_LOG_HITS):
+            to_log.append((texts[i],) + value[:2])
+    metrics.predictions_total.inc("Positive", amount=positives)
+    metrics.predictions_total.inc("Negative", amount=len(idx) - positives)
+
+    if to_log:
+        # Only queued here; the "logging" stage is timed where the insert runs
+        get_logger().log_many(to_log, version)
+    metrics.stage_latency.observe(time.perf_counter() - start, "total")
+    return results
+
+
+def predict_sentiment(text, model, vectorizer):
+    """
+    Predicts sentiment using the stable LogReg model.
+    """
+    label, confidence = predict_sentiment_batch([text], model, vectorizer, log=True)[0]
+    if label == "Neutral":
+        return label, confidence
+
+    # Sampled, structured replacement for the old per-request DEBUG print
+    if DEBUG_SAMPLE_RATE and random.random() < DEBUG_SAMPLE_RATE:
+        logger.info(json.dumps(
+            {"event": "prediction", "input": text[:100], "label": label, "score": round(confidence, 4)},
+            ensure_ascii=False,
+        ))
+    return label, confidence
+
+def predict_document(text, model, vectorizer, log=False):
+    """
+    Document mode: splits text into sentences (split_urdu_sentences) and
+    scores them all in one predict_sentiment_batch call. The document
+    label comes from the mean P(Positive) weighted by each sentence's
+    cleaned word count. Returns {"label", "confidence", "sentences"},
+    with (text, label, confidence, weight) dicts per sentence.
+    """
+    sentences = split_urdu_sentences(text)
+    if not sentences:
+        return {"label": "Neutral", "confidence": 0.0, "sentences": []}
+
+    results = predict_sentiment_batch(sentences, model, vectorizer, log=log)
+    weights = np.array([len(c.split()) for c in clean_urdu_texts(sentences)], dtype=np.float64)
+    positive = np.array([c if l == "Positive" else 1.0 - c for l, c in results])
+    score = float(np.dot(weights, positive) / weights.sum())
+    return {
+        "label": "Positive" if score >= 0.5 else "Negative",
+        "confidence": max(score, 1.0 - score),
+        "sentences": [
+            {"text": s, "label": l, "confidence": c, "weight": int(w)}
+            for s, (l, c), w in zip(sentences, results, weights)
+        ],
+    }
 
 if __name__ == "__main__":
     # Internal validation
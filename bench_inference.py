@@ -0,0 +1,261 @@
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+
+import numpy as np
+
+import backend
+from urdu_text import clean_urdu_texts
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+STAGES = ["clean", "transform", "predict_proba", "end_to_end"]
+DEFAULT_THRESHOLD = 0.10  # 10% slower than baseline counts as a regression
+TRIALS = 5  # independent timing runs per stage and batch size
+WARMUP_CALLS = 3
+MIN_P99_SAMPLES = 100  # fewer timed calls than this and p99 is just the slowest one
+P99_GATE_SAMPLES = 1000  # p99 only counts as a regression with this many calls behind it
+MIN_LATENCY_CHANGE_MS = 0.005  # smaller latency changes are timer and scheduler noise
+
+# Common Urdu review words plus noise the cleaner has to strip
+URDU_WORDS = [
+    "بہت", "اچھا", "اچھی", "برا", "بری", "فلم", "کتاب", "کھانا", "سروس", "ہے", "تھا", "تھی", "نہیں",
+    "یہ", "وہ", "بالکل", "فضول", "زبردست", "شاندار", "بیکار", "گھٹیا", "پسند", "آیا", "آئی", "مزہ",
+    "قیمت", "زیادہ", "کم", "وقت", "ضائع", "ہوا", "دوبارہ", "ضرور", "خریدیں", "میں", "کا", "کی", "کے",
+]
+NOISE = ["!!!", "100%", "ok", "😍", "👍", "۔", "؟", "\n", "10/10", "www.example.com"]
+
+
+def generate_corpus(n, length="lognormal", mean_words=12, seed=42, noise=0.1):
+    """
+    Synthetic Urdu reviews with a controlled length distribution:
+    'fixed' (always mean_words), 'uniform' (1..2*mean_words) or
+    'lognormal' (long-tailed, like real reviews).
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        if length == "fixed":
+            k = mean_words
+        elif length == "uniform":
+            k = rng.randint(1, 2 * mean_words)
+        else:
+            k = max(1, int(rng.lognormvariate(np.log(mean_words), 0.6)))
+        words = [rng.choice(NOISE) if rng.random() < noise else rng.choice(URDU_WORDS) for _ in range(k)]
+        texts.append(" ".join(words))
+    return texts
+
+
+def synthetic_model(corpus):
+    # Only used when no trained artifact is available; needs scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    positive = {"اچھا", "اچھی", "زبردست", "شاندار", "پسند", "مزہ", "ضرور"}
+    cleaned = clean_urdu_texts(corpus)
+    labels = [int(len(positive & set(t.split())) > 0) for t in cleaned]
+    vectorizer = TfidfVectorizer(max_features=5000)
+    model = LogisticRegression().fit(vectorizer.fit_transform(cleaned), labels)
+    return model, vectorizer
+
+
+class _NullLogger:
+    def log_many(self, items, model_version):
+        return len(items)
+
+
+def _stage_fn(stage, model, vectorizer):
+    if stage == "clean":
+        return lambda batch: clean_urdu_texts(batch)
+    if stage == "transform":
+        return lambda batch: vectorizer.transform(batch)
+    if stage == "predict_proba":
+        return lambda batch: model.predict_proba(batch)
+    return lambda batch: backend.predict_sentiment_batch(batch, model, vectorizer, log=True, use_cache=False)
+
+
+def _stage_input(stage, batch, vectorizer):
+    # Each stage is timed on its own input, so earlier stages are not counted twice
+    if stage in ("clean", "end_to_end"):
+        return batch
+    cleaned = clean_urdu_texts(batch)
+    return cleaned if stage == "transform" else vectorizer.transform(cleaned)
+
+
+def run_benchmarks(model, vectorizer, batch_sizes=BATCH_SIZES, stages=STAGES, min_items=20000,
+                   min_repeats=5, trials=TRIALS, corpus_kwargs=None):
+    corpus_kwargs = corpus_kwargs or {}
+    # Logging is stubbed out: end_to_end measures our code, not the log store
+    real_get_logger = backend.get_logger
+    backend.get_logger = lambda: _NullLogger()
+    try:
+        return _run(model, vectorizer, batch_sizes, stages, min_items, min_repeats, trials, corpus_kwargs)
+    finally:
+        backend.get_logger = real_get_logger
+
+
+def _run(model, vectorizer, batch_sizes, stages, min_items, min_repeats, trials, corpus_kwargs):
+    results = []
+    for batch_size in batch_sizes:
+        # Every trial is long enough on its own, and together they give p99 real samples
+        repeats = max(min_repeats, min_items // batch_size, -(-MIN_P99_SAMPLES // trials))
+        corpus = generate_corpus(batch_size * min(repeats, 20), **corpus_kwargs)
+        batches = [corpus[i:i + batch_size] for i in range(0, len(corpus), batch_size)]
+
+        for stage in stages:
+            fn = _stage_fn(stage, model, vectorizer)
+            inputs = [_stage_input(stage, b, vectorizer) for b in batches]
+            for r in range(WARMUP_CALLS):
+                fn(inputs[r % len(inputs)])
+
+            latencies, trial_throughputs, trial_p50s = [], [], []
+            for _ in range(trials):
+                trial = []
+                for r in range(repeats):
+                    x = inputs[r % len(inputs)]
+                    start = time.perf_counter()
+                    fn(x)
+                    trial.append(time.perf_counter() - start)
+                latencies += trial
+                trial_throughputs.append(batch_size * repeats / sum(trial))
+                trial_p50s.append(float(np.percentile(trial, 50)) * 1000)
+
+            # Separate pass: tracemalloc slows the code down, so it never overlaps the timing
+            tracemalloc.start()
+            fn(inputs[0])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            lat = np.array(latencies)
+            results.append({
+                "stage": stage,
+                "batch_size": batch_size,
+                "trials": trials,
+                "repeats": repeats,
+                "samples": len(lat),
+                "throughput_per_s": round(float(np.median(trial_throughputs)), 1),
+                "best_throughput_per_s": round(float(max(trial_throughputs)), 1),
+                "trial_throughputs_per_s": [round(float(t), 1) for t in trial_throughputs],
+                "p50_ms": round(float(np.percentile(lat, 50)) * 1000, 4),
+                "best_p50_ms": round(min(trial_p50s), 4),
+                "trial_p50_ms": [round(t, 4) for t in trial_p50s],
+                "p99_ms": round(float(np.percentile(lat, 99)) * 1000, 4) if len(lat) >= MIN_P99_SAMPLES else None,
+                "peak_mem_kb": round(peak / 1024, 1),
+            })
+            p99 = results[-1]["p99_ms"]
+            print(f"{stage:<14} batch={batch_size:<6} {results[-1]['throughput_per_s']:>12,.0f}/s  "
+                  f"best={results[-1]['best_throughput_per_s']:,.0f}/s  p50={results[-1]['p50_ms']:.3f}ms  "
+                  f"p99={'-' if p99 is None else f'{p99:.3f}ms'}  peak={results[-1]['peak_mem_kb']:.0f}KB")
+    return results
+
+
+def incompatibilities(report, baseline):
+    """Reasons the two reports do not measure the same thing; empty when they can be compared."""
+    problems = []
+    if baseline.get("corpus") != report["corpus"]:
+        problems.append(f"corpus {baseline.get('corpus')} vs {report['corpus']}")
+    keys = {(r["stage"], r["batch_size"]) for r in report["results"]}
+    base_keys = {(r["stage"], r["batch_size"]) for r in baseline.get("results", [])}
+    if keys != base_keys:
+        stages = lambda k: sorted({stage for stage, _ in k})
+        sizes = lambda k: sorted({size for _, size in k})
+        problems.append(f"stages {stages(base_keys)} x batch sizes {sizes(base_keys)} "
+                        f"vs {stages(keys)} x {sizes(keys)}")
+    if any("trial_p50_ms" not in r for r in baseline.get("results", [])):
+        problems.append("baseline was recorded without trials; record it again")
+    return problems
+
+
+def _spread(values):
+    """How far apart the trials of one result landed, as a fraction of the largest."""
+    return (max(values) - min(values)) / max(values) if max(values) else 0.0
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns a list of regressions against the baseline report: best-trial
+    throughput down, or best-trial p50 / pooled p99 up, by more than threshold.
+    The best trial is the one least disturbed by the rest of the machine.
+    A change smaller than the trial-to-trial spread of either run is noise,
+    so the spread is added to the threshold; p99 is only judged with at
+    least P99_GATE_SAMPLES calls in both runs.
+    """
+    base = {(r["stage"], r["batch_size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        b = base.get((r["stage"], r["batch_size"]))
+        if b is None:
+            continue
+        tolerance = threshold + max(_spread(r["trial_throughputs_per_s"]), _spread(b["trial_throughputs_per_s"]))
+        if r["best_throughput_per_s"] < b["best_throughput_per_s"] * (1 - tolerance):
+            regressions.append({**r, "metric": "best_throughput_per_s", "baseline": b["best_throughput_per_s"]})
+
+        p50_tolerance = threshold + max(_spread(r["trial_p50_ms"]), _spread(b["trial_p50_ms"]))
+        if (r["best_p50_ms"] > b["best_p50_ms"] * (1 + p50_tolerance)
+                and r["best_p50_ms"] - b["best_p50_ms"] > MIN_LATENCY_CHANGE_MS):
+            regressions.append({**r, "metric": "best_p50_ms", "baseline": b["best_p50_ms"]})
+
+        if (min(r["samples"], b["samples"]) >= P99_GATE_SAMPLES
+                and r["p99_ms"] > b["p99_ms"] * (1 + tolerance)
+                and r["p99_ms"] - b["p99_ms"] > MIN_LATENCY_CHANGE_MS):
+            regressions.append({**r, "metric": "p99_ms", "baseline": b["p99_ms"]})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the inference hot path.")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--batch-sizes", default=",".join(map(str, BATCH_SIZES)))
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--length", choices=["lognormal", "uniform", "fixed"], default="lognormal")
+    parser.add_argument("--mean-words", type=int, default=12)
+    parser.add_argument("--trials", type=int, default=TRIALS)
+    parser.add_argument("--model", choices=["backend", "synthetic"], default="backend")
+    args = parser.parse_args()
+
+    if args.model == "backend":
+        try:
+            model, vectorizer = backend.get_backend()
+        except FileNotFoundError:
+            print("No trained model found; falling back to a synthetic model.")
+            args.model = "synthetic"
+    if args.model == "synthetic":
+        model, vectorizer = synthetic_model(generate_corpus(5000, seed=0))
+
+    results = run_benchmarks(
+        model, vectorizer,
+        batch_sizes=[int(b) for b in args.batch_sizes.split(",")],
+        stages=args.stages.split(","),
+        trials=args.trials,
+        corpus_kwargs={"length": args.length, "mean_words": args.mean_words},
+    )
+    report = {
+        "model": args.model,
+        "model_version": backend.model_version_of(model),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": {"length": args.length, "mean_words": args.mean_words},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = incompatibilities(report, baseline)
+        if problems:
+            print("Not comparable with the baseline: " + "; ".join(problems))
+            sys.exit(2)
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} batch={r['batch_size']} {r['metric']}: "
+                  f"{r['baseline']} -> {r[r['metric']]}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
@@ -0,0 +1,282 @@
+import os
+import sys
+import json
+import pickle
+import threading
+
+import numpy as np
+
+from startup_profile import timed
+
+# Artifacts written by train_bilstm.py
+KERAS_MODEL_PATH = "bilstm_urdu_sentiment_model.h5"
+KERAS_TOKENIZER_PATH = "tokenizer.pkl"
+
+# CPU-optimized export (see export_tflite)
+TFLITE_MODEL_DIR = "bilstm_tflite"
+
+BILSTM_MODEL_VERSION = "bilstm_tflite_v1"
+MAX_LEN = 120  # must match train_bilstm.MAX_LEN
+LENGTH_BUCKETS = (8, 16, 32, 64, MAX_LEN)
+BATCH_SIZES = (1, 8, 64)  # larger groups run in chunks of the largest
+NUM_THREADS = int(os.getenv("BILSTM_NUM_THREADS", "1"))
+
+# Same characters Keras' Tokenizer strips before splitting on spaces
+_KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+_FILTER_TABLE = str.maketrans({c: " " for c in _KERAS_FILTERS})
+
+
+def _load_interpreter_class():
+    # The standalone runtimes are a few MB; fall back to the full TensorFlow package
+    for module in ("ai_edge_litert.interpreter", "tflite_runtime.interpreter"):
+        try:
+            return __import__(module, fromlist=["Interpreter"]).Interpreter
+        except ImportError:
+            pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class SequenceTokenizer:
+    """
+    Pure-Python equivalent of the trained Keras Tokenizer's texts_to_sequences,
+    loaded from the JSON vocabulary written by export_tflite.
+    """
+
+    def __init__(self, word_index, num_words=None, oov_index=None):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_index = oov_index
+
+    def transform(self, texts):
+        word_index = self.word_index
+        num_words = self.num_words
+        oov = self.oov_index
+        sequences = []
+        for text in texts:
+            seq = []
+            for word in text.lower().translate(_FILTER_TABLE).split(" "):
+                if not word:
+                    continue
+                i = word_index.get(word)
+                if i is not None and (not num_words or i < num_words):
+                    seq.append(i)
+                elif oov is not None:
+                    seq.append(oov)
+            sequences.append(seq)
+        return sequences
+
+
+class BucketedBiLSTM:
+    """
+    Batched BiLSTM inference on TFLite graphs (XNNPACK on CPU).
+    Sequences are grouped by length and each group is padded only to its
+    bucket size (pre-padding, as in training) instead of always to MAX_LEN,
+    so recurrent work follows the real review length. Converted LSTMs do
+    not survive resizing their input, so one static graph is exported per
+    (batch size, bucket) and a group is cut into the fewest chunks of the
+    exported batch sizes. Interpreters are built on first use and kept, so
+    tensors are not reallocated on every call. An interpreter holds its
+    input, output and LSTM state between calls, so each one is used by one
+    thread at a time.
+    Exposes predict_proba/classes_ like the linear model, so backend's
+    batching, cache and logging work unchanged.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, graphs, buckets=LENGTH_BUCKETS, num_threads=NUM_THREADS,
+                 model_version=BILSTM_MODEL_VERSION):
+        self.graphs = dict(graphs)  # (batch size, bucket) -> TFLite flatbuffer
+        self.batch_sizes = tuple(sorted({size for size, _ in self.graphs}))
+        self.buckets = tuple(sorted(b for b in buckets if any(key[1] == b for key in self.graphs)))
+        if not self.buckets:
+            raise ValueError("No exported graph matches the requested buckets")
+        self.num_threads = num_threads
+        self.model_version = model_version
+        self._interpreter_class = _load_interpreter_class()
+        self._interpreters = {}  # (batch size, bucket) -> (interpreter, input index, output index, lock)
+        self._lock = threading.Lock()  # guards _interpreters and bucket_counts
+        self.bucket_counts = {b: 0 for b in self.buckets}
+
+    def _bucket_for(self, length):
+        for b in self.buckets:
+            if length <= b:
+                return b
+        return self.buckets[-1]
+
+    def _batch_for(self, remaining):
+        for b in self.batch_sizes:
+            if remaining <= b:
+                return b
+        return self.batch_sizes[-1]
+
+    def _run(self, bucket, batch):
+        size = self._batch_for(len(batch))
+        with self._lock:
+            entry = self._interpreters.get((size, bucket))
+            if entry is None:
+                interpreter = self._interpreter_class(model_content=self.graphs[(size, bucket)],
+                                                      num_threads=self.num_threads)
+                interpreter.allocate_tensors()
+                inp = interpreter.get_input_details()[0]["index"]
+                out = interpreter.get_output_details()[0]["index"]
+                entry = self._interpreters[(size, bucket)] = (interpreter, inp, out, threading.Lock())
+        interpreter, inp, out, lock = entry
+        n = len(batch)
+        if n < size:
+            batch = np.concatenate([batch, np.zeros((size - n, bucket), dtype=batch.dtype)])
+        with lock:
+            # A fused LSTM keeps its state in variable tensors between invocations
+            interpreter.reset_all_variables()
+            interpreter.set_tensor(inp, batch)
+            interpreter.invoke()
+            return interpreter.get_tensor(out).reshape(-1)[:n]
+
+    def warm(self):
+        """Builds and invokes the interpreter of every (batch size, bucket) once, off the request path."""
+        for size, bucket in sorted(self.graphs):
+            if bucket in self.buckets:
+                self._run(bucket, np.zeros((size, bucket), dtype=np.int32))
+
+    def pad(self, sequences, bucket):
+        """Pre-pads and pre-truncates sequences to bucket, like pad_sequences."""
+        padded = np.zeros((len(sequences), bucket), dtype=np.int32)
+        for row, seq in enumerate(sequences):
+            seq = seq[-bucket:]
+            if seq:
+                padded[row, bucket - len(seq):] = seq
+        return padded
+
+    def predict_proba(self, sequences):
+        n = len(sequences)
+        positive = np.zeros(n, dtype=np.float64)
+        groups = {}
+        for i, seq in enumerate(sequences):
+            groups.setdefault(self._bucket_for(len(seq)), []).append(i)
+
+        with self._lock:
+            for bucket, idx in groups.items():
+                self.bucket_counts[bucket] += len(idx)
+
+        for bucket, idx in groups.items():
+            padded = self.pad([sequences[i] for i in idx], bucket)
+            start = 0
+            while start < len(idx):
+                size = self._batch_for(len(idx) - start)
+                chunk = padded[start:start + size]
+                positive[idx[start:start + size]] = self._run(bucket, chunk)
+                start += size
+
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _graph_name(size, bucket):
+    return f"batch_{size}_len_{bucket}.tflite"
+
+
+def load_bilstm(model_dir=TFLITE_MODEL_DIR):
+    """Loads the exported TFLite BiLSTM. Returns (model, tokenizer) for backend.predict_sentiment_batch."""
+    vocab_path = os.path.join(model_dir, "vocab.json")
+    if not os.path.exists(vocab_path):
+        raise FileNotFoundError(f"BiLSTM export not found in {model_dir}/. Run 'python bilstm_engine.py' first.")
+    with timed("bilstm load (tflite)"):
+        with open(vocab_path, encoding="utf-8") as f:
+            vocab = json.load(f)
+        if "buckets" not in vocab:
+            raise FileNotFoundError(f"{model_dir}/ holds an older export. Run 'python bilstm_engine.py' again.")
+        graphs = {}
+        for size in vocab["batch_sizes"]:
+            for bucket in vocab["buckets"]:
+                with open(os.path.join(model_dir, _graph_name(size, bucket)), "rb") as f:
+                    graphs[(size, bucket)] = f.read()
+        tokenizer = SequenceTokenizer(vocab["word_index"], vocab.get("num_words"), vocab.get("oov_index"))
+        model = BucketedBiLSTM(graphs, vocab["buckets"], model_version=vocab.get("model_version", BILSTM_MODEL_VERSION))
+    return model, tokenizer
+
+
+def export_tflite(keras_path=KERAS_MODEL_PATH, tokenizer_path=KERAS_TOKENIZER_PATH,
+                  out_dir=TFLITE_MODEL_DIR, batch_sizes=BATCH_SIZES, buckets=LENGTH_BUCKETS, quantize=False):
+    """
+    Converts the trained Keras BiLSTM into one static TFLite graph per
+    (batch size, bucket) and the Keras tokenizer into a JSON vocabulary,
+    all under out_dir. quantize=True applies dynamic-range int8 weight
+    quantization.
+    """
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(keras_path)
+
+    def forward(x):
+        # The layers are called directly so the graph is not tied to MAX_LEN
+        for layer in keras_model.layers:
+            x = layer(x, training=False)
+        return x
+
+    graphs = {}
+    for size in batch_sizes:
+        for bucket in buckets:
+            spec = tf.TensorSpec([size, bucket], tf.int32)
+            fn = tf.function(forward, input_signature=[spec]).get_concrete_function()
+            # No trackable object: the weights are frozen into the graph as constants
+            converter = tf.lite.TFLiteConverter.from_concrete_functions([fn])
+            if quantize:
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            graphs[(size, bucket)] = converter.convert()
+
+    with open(tokenizer_path, "rb") as f:
+        tokenizer = pickle.load(f)
+    num_words = tokenizer.num_words
+    oov_index = tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token else None
+    # Words at or past num_words are never emitted, so they are not exported
+    word_index = {w: i for w, i in tokenizer.word_index.items() if not num_words or i < num_words}
+
+    # Nothing is written until every conversion has succeeded
+    os.makedirs(out_dir, exist_ok=True)
+    for (size, bucket), content in graphs.items():
+        with open(os.path.join(out_dir, _graph_name(size, bucket)), "wb") as f:
+            f.write(content)
+    with open(os.path.join(out_dir, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_version": BILSTM_MODEL_VERSION,
+            "batch_sizes": sorted(batch_sizes),
+            "buckets": sorted(buckets),
+            "num_words": num_words,
+            "oov_index": oov_index,
+            "max_len": MAX_LEN,
+            "word_index": word_index,
+        }, f, ensure_ascii=False)
+    return out_dir
+
+
+def check_agreement(model, tokenizer, texts):
+    """
+    Compares bucketed scores against padding everything to MAX_LEN.
+    The model was trained on MAX_LEN pre-padded input without masking, so
+    the shorter padding is an approximation; this reports how close it is.
+    """
+    sequences = tokenizer.transform(texts)
+    bucketed = model.predict_proba(sequences)[:, 1]
+    full = BucketedBiLSTM(model.graphs, buckets=(MAX_LEN,)).predict_proba(sequences)[:, 1]
+    return {
+        "n": len(texts),
+        "max_abs_diff": float(np.max(np.abs(bucketed - full))) if len(texts) else 0.0,
+        "label_agreement": float(np.mean((bucketed >= 0.5) == (full >= 0.5))) if len(texts) else 1.0,
+    }
+
+
+if __name__ == "__main__":
+    # python bilstm_engine.py [--quantize]
+    try:
+        out_dir = export_tflite(quantize="--quantize" in sys.argv)
+        print(f"Exported {KERAS_MODEL_PATH} + {KERAS_TOKENIZER_PATH} to {out_dir}/")
+    except Exception as e:
+        print(f"Export failed: {e}")
+        sys.exit(1)
+
+    if os.path.exists("urdu_cleaned_dataset.csv"):
+        import pandas as pd
+        from urdu_text import clean_urdu_texts
+        df = pd.read_csv("urdu_cleaned_dataset.csv", nrows=2000)
+        model, tokenizer = load_bilstm(out_dir)
+        print(f"Bucketed vs MAX_LEN padding: {check_agreement(model, tokenizer, clean_urdu_texts(df['cleaned_review']))}")
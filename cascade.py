@@ -0,0 +1,71 @@
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# Inputs the linear model scores below this confidence are re-scored by the BiLSTM
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.75"))
+
+
+def _positive_proba(probs, classes):
+    """Column of P(class 1), whatever order the model keeps its classes in."""
+    return np.asarray(probs)[:, list(np.asarray(classes)).index(1)]
+
+
+class PassthroughVectorizer:
+    """The cascade vectorizes per tier, so backend hands it the cleaned texts as they are."""
+
+    def transform(self, texts):
+        return list(texts)
+
+
+class CascadeModel:
+    """
+    Confidence-gated cascade: every text is scored by the fast model and
+    only those below threshold confidence are sent to the slow model.
+    Plugs into backend.predict_sentiment_batch like a single model
+    (with PassthroughVectorizer); predict_proba_tiers also reports which
+    tier answered each text. Per-tier counts and latency go to metrics.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, fast, fast_vectorizer, slow, slow_vectorizer, threshold=CASCADE_THRESHOLD,
+                 tiers=metrics.TIERS, versions=None):
+        self.fast, self.fast_vectorizer = fast, fast_vectorizer
+        self.slow, self.slow_vectorizer = slow, slow_vectorizer
+        self.threshold = threshold
+        self.fast_tier, self.slow_tier = tiers
+        # The threshold changes answers, so it is part of the cache/log version
+        fast_version, slow_version = versions or (
+            getattr(fast, "model_version", self.fast_tier), getattr(slow, "model_version", self.slow_tier)
+        )
+        self.model_version = f"cascade[{fast_version}|{slow_version}@{threshold:g}]"
+
+    def predict_proba_tiers(self, texts):
+        """Returns (probabilities as [P(0), P(1)], tier name per text)."""
+        start = time.perf_counter()
+        positive = _positive_proba(self.fast.predict_proba(self.fast_vectorizer.transform(texts)), self.fast.classes_)
+        metrics.tier_latency.observe(time.perf_counter() - start, self.fast_tier)
+
+        tiers = np.full(len(texts), self.fast_tier, dtype=object)
+        uncertain = np.flatnonzero(np.maximum(positive, 1.0 - positive) < self.threshold)
+        if len(uncertain):
+            start = time.perf_counter()
+            escalated = [texts[i] for i in uncertain]
+            slow_probs = self.slow.predict_proba(self.slow_vectorizer.transform(escalated))
+            positive[uncertain] = _positive_proba(slow_probs, self.slow.classes_)
+            tiers[uncertain] = self.slow_tier
+            metrics.tier_latency.observe(time.perf_counter() - start, self.slow_tier)
+
+        metrics.tier_predictions_total.inc(self.fast_tier, amount=len(texts) - len(uncertain))
+        metrics.tier_predictions_total.inc(self.slow_tier, amount=len(uncertain))
+        return np.column_stack([1.0 - positive, positive]), tiers.tolist()
+
+    def predict_proba(self, texts):
+        return self.predict_proba_tiers(texts)[0]
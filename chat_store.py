@@ -0,0 +1,229 @@
+import os
+import time
+import bisect
+import sqlite3
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHAT_STORE_PATH = os.getenv("CHAT_STORE_PATH", "chat_history.db")
+TITLE_LENGTH = 30
+GRAM = 3  # title search index granularity (characters)
+
+
+def make_title(messages):
+    """Title from the first user message, as the chat page has always shown it."""
+    for msg in messages:
+        if msg["role"] == "user":
+            return msg["content"][:TITLE_LENGTH] + ("..." if len(msg["content"]) > TITLE_LENGTH else "")
+    return "New Chat"
+
+
+def _grams(text):
+    text = text.lower()
+    if len(text) <= GRAM:
+        return {text} if text else set()
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class ChatIndex:
+    """
+    In-memory index of one user's chats (titles only, no messages).
+    Chat ids only grow, so the newest-first order is kept by appending;
+    deletes use bisect. Titles are indexed by character trigrams:
+    a search intersects the query's trigram sets and checks the few
+    candidates, instead of scanning every title.
+    """
+
+    def __init__(self, chats=()):
+        self.ids = []      # ascending chat ids
+        self.titles = {}   # chat id -> title
+        self.grams = {}    # trigram -> set of chat ids
+        for chat_id, title in sorted(chats):
+            self.add(chat_id, title)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, chat_id, title):
+        if chat_id in self.titles:
+            self.set_title(chat_id, title)
+            return
+        if self.ids and chat_id < self.ids[-1]:
+            bisect.insort(self.ids, chat_id)
+        else:
+            self.ids.append(chat_id)
+        self.titles[chat_id] = title
+        self._index(chat_id, title)
+
+    def set_title(self, chat_id, title):
+        old = self.titles.get(chat_id)
+        if old == title:
+            return
+        if old is not None:
+            self._unindex(chat_id, old)
+        self.titles[chat_id] = title
+        self._index(chat_id, title)
+
+    def remove(self, chat_id):
+        title = self.titles.pop(chat_id, None)
+        if title is None:
+            return
+        del self.ids[bisect.bisect_left(self.ids, chat_id)]
+        self._unindex(chat_id, title)
+
+    def _index(self, chat_id, title):
+        for g in _grams(title):
+            self.grams.setdefault(g, set()).add(chat_id)
+
+    def _unindex(self, chat_id, title):
+        for g in _grams(title):
+            ids = self.grams.get(g)
+            if ids:
+                ids.discard(chat_id)
+                if not ids:
+                    del self.grams[g]
+
+    def search(self, query):
+        """Chat ids whose title contains query (case-insensitive), newest first."""
+        query = query.lower()
+        if len(query) < GRAM:
+            # Too short for the trigram index; titles are short, so filter the ones in memory
+            return [i for i in reversed(self.ids) if query in self.titles[i].lower()]
+        candidates = None
+        for g in _grams(query):
+            ids = self.grams.get(g)
+            if not ids:
+                return []
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        return sorted((i for i in candidates if query in self.titles[i].lower()), reverse=True)
+
+    def page(self, limit, offset=0, query=""):
+        """(chat_id, title) pairs for one sidebar page, newest first."""
+        if query:
+            ids = self.search(query)[offset:offset + limit]
+        else:
+            end = len(self.ids) - offset
+            ids = self.ids[max(0, end - limit):max(0, end)][::-1]
+        return [(i, self.titles[i]) for i in ids]
+
+
+class ChatStore:
+    """
+    Chat history persisted per user in a local SQLite file (WAL mode).
+    Only titles are read up front (see index); message bodies are loaded
+    when a chat is opened and appended incrementally as they arrive.
+    Chat ids come from a per-user sequence, so the id of a deleted chat
+    is never handed out again.
+    """
+
+    SCHEMA = """
+    create table if not exists chats (
+        user_id text not null,
+        chat_id integer not null,
+        title text not null,
+        created_at real not null,
+        updated_at real not null,
+        primary key (user_id, chat_id)
+    );
+    create table if not exists chat_messages (
+        user_id text not null,
+        chat_id integer not null,
+        seq integer not null,
+        role text not null,
+        content text not null,
+        primary key (user_id, chat_id, seq)
+    );
+    create table if not exists chat_sequences (
+        user_id text primary key,
+        last_chat_id integer not null
+    );
+    """
+
+    def __init__(self, path=CHAT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(self.SCHEMA)
+
+    def index(self, user_id):
+        """Builds the ChatIndex for a user from titles alone."""
+        with self._lock:
+            rows = self._conn.execute(
+                "select chat_id, title from chats where user_id = ?", (user_id,)
+            ).fetchall()
+        return ChatIndex(rows)
+
+    def create_chat(self, user_id, title="New Chat"):
+        """Creates an empty chat and returns its id."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert into chat_sequences (user_id, last_chat_id) values (?, 1) "
+                "on conflict (user_id) do update set last_chat_id = last_chat_id + 1",
+                (user_id,),
+            )
+            (chat_id,) = self._conn.execute(
+                "select last_chat_id from chat_sequences where user_id = ?", (user_id,)
+            ).fetchone()
+            self._conn.execute(
+                "insert into chats (user_id, chat_id, title, created_at, updated_at) values (?, ?, ?, ?, ?)",
+                (user_id, chat_id, title, now, now),
+            )
+        return chat_id
+
+    def append_messages(self, user_id, chat_id, messages, start):
+        """Stores messages[start:] (the ones not saved yet) as one transaction."""
+        rows = [
+            (user_id, chat_id, seq, msg["role"], msg["content"])
+            for seq, msg in enumerate(messages[start:], start)
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "insert or replace into chat_messages (user_id, chat_id, seq, role, content) values (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "update chats set updated_at = ? where user_id = ? and chat_id = ?", (time.time(), user_id, chat_id)
+            )
+
+    def set_title(self, user_id, chat_id, title):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "update chats set title = ? where user_id = ? and chat_id = ?", (title, user_id, chat_id)
+            )
+
+    def load_messages(self, user_id, chat_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "select role, content from chat_messages where user_id = ? and chat_id = ? order by seq",
+                (user_id, chat_id),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def delete_chat(self, user_id, chat_id):
+        with self._lock, self._conn:
+            self._conn.execute("delete from chat_messages where user_id = ? and chat_id = ?", (user_id, chat_id))
+            self._conn.execute("delete from chats where user_id = ? and chat_id = ?", (user_id, chat_id))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chat_store():
+    """Returns the process-wide ChatStore."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ChatStore(CHAT_STORE_PATH)
+    return _store
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+# Same columns as the hand-maintained model_comparison_week2.csv, then the cost metrics
+FIELDS = [
+    "model", "accuracy", "precision", "recall", "f1",
+    "latency_p50_ms", "latency_p99_ms", "throughput_per_s", "load_seconds", "artifact_mb", "rss_mb",
+]
+DATASET_PATH = "urdu_cleaned_dataset.csv"
+OUTPUT_PATH = "model_comparison.csv"
+SINGLE_ITEMS = 200
+BATCH_SIZE = 256
+
+
+def _load_linear():
+    import backend
+    return backend.initialize_backend()
+
+
+def _load_bilstm():
+    import backend
+    return backend.initialize_bilstm_backend()
+
+
+def _linear_artifacts():
+    import backend
+    if os.path.exists(os.path.join(backend.LINEAR_MODEL_DIR, "manifest.json")):
+        return [backend.LINEAR_MODEL_DIR]
+    return [backend.MODEL_PATH, backend.TOKENIZER_PATH]
+
+
+def _bilstm_artifacts():
+    from bilstm_engine import TFLITE_MODEL_DIR
+    return [TFLITE_MODEL_DIR]
+
+
+# name -> (loader returning (model, vectorizer), artifact paths); add new models here
+MODELS = {
+    "SVM": (_load_linear, _linear_artifacts),
+    "BiLSTM": (_load_bilstm, _bilstm_artifacts),
+}
+
+
+def _size_mb(paths):
+    total = 0
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        elif os.path.exists(path):
+            total += os.path.getsize(path)
+    return total / 2**20
+
+
+def _rss_mb():
+    # Current resident set size; None where it cannot be read
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+def evaluate(name, path=DATASET_PATH, single_items=SINGLE_ITEMS, batch_size=BATCH_SIZE):
+    """Scores one model on the fixed test split. Meant to run in its own process (see main)."""
+    import backend
+    from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+    from train_linear import load_splits
+
+    texts, y_true = load_splits(path)["test"]
+    loader, artifacts = MODELS[name]
+    rss_before = _rss_mb()
+
+    start = time.perf_counter()
+    model, vectorizer = loader()
+    load_seconds = time.perf_counter() - start
+
+    def score(batch):
+        return backend.predict_sentiment_batch(batch, model, vectorizer, log=False, use_cache=False)
+
+    score(texts[:1])  # warm-up
+    latencies = []
+    for text in texts[:single_items]:
+        start = time.perf_counter()
+        score([text])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = []
+    for i in range(0, len(texts), batch_size):
+        results.extend(score(texts[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    # Neutral (empty after cleaning) counts as not Positive
+    y_pred = np.array([label == "Positive" for label, _ in results], dtype=np.int64)
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average="binary", zero_division=0)
+    rss_after = _rss_mb()
+    return {
+        "model": name,
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "latency_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "latency_p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "throughput_per_s": len(texts) / elapsed if elapsed else None,
+        "load_seconds": load_seconds,
+        "artifact_mb": _size_mb(artifacts()),
+        "rss_mb": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def run_isolated(name, path=DATASET_PATH):
+    """Runs evaluate() in a fresh interpreter so load time and memory are not shared between models."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--single", name, "--data", path],
+        capture_output=True, text=True, encoding="utf-8",
+    )
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        print(f"Warning: {name} failed: {(proc.stderr or proc.stdout).strip().splitlines()[-1:]}")
+        return None
+    return json.loads(lines[-1])
+
+
+def main(names=None, path=DATASET_PATH, out=OUTPUT_PATH):
+    import pandas as pd
+
+    rows = []
+    for name in names or MODELS:
+        missing = [p for p in MODELS[name][1]() if not os.path.exists(p)]
+        if missing:
+            print(f"Skipping {name}: {', '.join(missing)} not found.")
+            continue
+        print(f"Evaluating {name}...")
+        row = run_isolated(name, path)
+        if row:
+            rows.append(row)
+
+    df = pd.DataFrame(rows, columns=FIELDS)
+    df.to_csv(out, index=False)
+    print(df.to_string(index=False))
+    print(f"Saved {out}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy and cost comparison of the available sentiment models.")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--out", default=OUTPUT_PATH)
+    parser.add_argument("--models", nargs="+", choices=list(MODELS))
+    parser.add_argument("--single", choices=list(MODELS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(evaluate(args.single, args.data)))
+    else:
+        main(args.models, args.data, args.out)
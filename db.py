@@ -1,6 +1,7 @@
 import os
-from supabase import create_client
+import threading
 from dotenv import load_dotenv
+from startup_profile import timed
 
 # Load environment variables
 load_dotenv()
@@ -12,16 +13,52 @@ anon_key = os.getenv("SUPABASE_ANON_KEY")
 # Admin key can be under several names
 admin_key = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-# Initialize Public Client
-if url and anon_key:
-    supabase_public = create_client(url, anon_key)
-else:
-    print("Warning: SUPABASE_URL or SUPABASE_ANON_KEY missing. Public client not initialized.")
-    supabase_public = None
-
-# Initialize Admin Client
-if url and admin_key:
-    supabase_admin = create_client(url, admin_key)
-else:
-    print("Warning: Admin key (SUPABASE_KEY/SERVICE_KEY) missing. Admin client not initialized.")
-    supabase_admin = None
\ No newline at end of file
+# Clients are created on first use, not at import time
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get_client(name, key, missing_message):
+    if name in _clients:
+        return _clients[name]
+    with _lock:
+        if name not in _clients:
+            if url and key:
+                with timed(f"supabase client ({name})"):
+                    from supabase import create_client
+                    _clients[name] = create_client(url, key)
+            else:
+                print(missing_message)
+                _clients[name] = None
+    return _clients[name]
+
+
+def get_public_client():
+    """Returns the anon-key client, or None when it is not configured."""
+    return _get_client("public", anon_key, "Warning: SUPABASE_URL or SUPABASE_ANON_KEY missing. Public client not initialized.")
+
+
+def get_admin_client():
+    """Returns the service-key client, or None when it is not configured."""
+    return _get_client("admin", admin_key, "Warning: Admin key (SUPABASE_KEY/SERVICE_KEY) missing. Admin client not initialized.")
+
+
+def new_public_client():
+    """
+    A separate anon-key client that is not shared, e.g. to hold one browser
+    session's sign-in. None when it is not configured.
+    """
+    if not (url and anon_key):
+        print("Warning: SUPABASE_URL or SUPABASE_ANON_KEY missing. Public client not initialized.")
+        return None
+    from supabase import create_client
+    return create_client(url, anon_key)
+
+
+def __getattr__(name):
+    # Keeps `from db import supabase_public` working while staying lazy
+    if name == "supabase_public":
+        return get_public_client()
+    if name == "supabase_admin":
+        return get_admin_client()
+    raise AttributeError(f"module 'db' has no attribute '{name}'")
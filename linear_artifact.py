@@ -0,0 +1,252 @@
+import os
+import re
+import sys
+import json
+import pickle
+
+import numpy as np
+import scipy.sparse as sp
+
+# Default location of the exported, pickle-free linear model
+LINEAR_MODEL_DIR = "linear_model"  # keep in sync with backend.LINEAR_MODEL_DIR
+MANIFEST_NAME = "manifest.json"
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class MappedTfidfVectorizer:
+    """
+    Pure NumPy/SciPy replacement for a fitted TfidfVectorizer.
+    The vocabulary is a sorted, memory-mapped unicode array looked up with
+    np.searchsorted, so worker processes share one copy through the page
+    cache instead of each holding a Python dict.
+    """
+
+    def __init__(self, meta, terms, columns, idf):
+        self.n_features = meta["n_features"]
+        self.lowercase = meta["lowercase"]
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.norm = meta["norm"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.binary = meta["binary"]
+        self.token_pattern = re.compile(meta["token_pattern"])
+        self.terms = terms
+        self.columns = columns
+        self.idf = idf
+
+    def _analyze(self, doc):
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self.token_pattern.findall(doc)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                grams.append(" ".join(tokens[i:i + n]))
+        return grams
+
+    def transform(self, texts):
+        rows, grams = [], []
+        n_docs = 0
+        for row, doc in enumerate(texts):
+            doc_grams = self._analyze(doc)
+            grams.extend(doc_grams)
+            rows.extend([row] * len(doc_grams))
+            n_docs = row + 1
+
+        if grams:
+            grams = np.array(grams)
+            pos = np.searchsorted(self.terms, grams)
+            pos[pos >= len(self.terms)] = 0
+            found = self.terms[pos] == grams
+            cols = self.columns[pos[found]]
+            rows = np.asarray(rows, dtype=np.int64)[found]
+        else:
+            cols = rows = np.zeros(0, dtype=np.int64)
+
+        X = sp.csr_matrix(
+            (np.ones(len(cols)), (rows, cols)),
+            shape=(n_docs, self.n_features),
+            dtype=np.float64,
+        )
+        X.sum_duplicates()
+
+        if self.binary:
+            X.data[:] = 1.0
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm:
+            lengths = np.diff(X.indptr)
+            values = X.data ** 2 if self.norm == "l2" else np.abs(X.data)
+            # Per-row sums; empty rows keep a norm of 1 so they stay all-zero
+            row_sums = np.bincount(np.repeat(np.arange(n_docs), lengths), weights=values, minlength=n_docs)
+            row_norms = np.sqrt(row_sums) if self.norm == "l2" else row_sums
+            row_norms[row_norms == 0] = 1.0
+            X.data /= np.repeat(row_norms, lengths)
+        return X
+
+
+class MappedLinearModel:
+    """
+    predict_proba for an exported linear classifier.
+    Handles LogisticRegression, SGDClassifier(loss="log_loss") and
+    CalibratedClassifierCV(method="sigmoid") over a linear estimator; coefficients are memory-mapped.
+    """
+
+    def __init__(self, meta, coef, intercept, sigmoid_a=None, sigmoid_b=None):
+        self.kind = meta["kind"]
+        self.classes_ = np.asarray(meta["classes"])
+        self.coef = coef            # (n_models, n_outputs, n_features)
+        self.intercept = intercept  # (n_models, n_outputs)
+        self.sigmoid_a = sigmoid_a
+        self.sigmoid_b = sigmoid_b
+
+    def _decision(self, X, m):
+        return np.asarray(X @ self.coef[m].T) + self.intercept[m]
+
+    def predict_proba(self, X):
+        n_classes = len(self.classes_)
+        if self.kind in ("logistic", "logistic_ovr"):
+            d = self._decision(X, 0)
+            if n_classes == 2:
+                p = _expit(d[:, 0])
+                return np.column_stack([1.0 - p, p])
+            if self.kind == "logistic_ovr":
+                p = _expit(d)
+                return p / p.sum(axis=1, keepdims=True)
+            d = d - d.max(axis=1, keepdims=True)
+            e = np.exp(d)
+            return e / e.sum(axis=1, keepdims=True)
+
+        # calibrated_sigmoid: average of per-fold calibrated probabilities
+        total = np.zeros((X.shape[0], n_classes))
+        for m in range(self.coef.shape[0]):
+            d = self._decision(X, m)
+            calibrated = _expit(-(self.sigmoid_a[m] * d + self.sigmoid_b[m]))
+            proba = np.zeros_like(total)
+            if n_classes == 2:
+                proba[:, 1] = calibrated[:, 0]
+                proba[:, 0] = 1.0 - proba[:, 1]
+            else:
+                denominator = calibrated.sum(axis=1, keepdims=True)
+                proba = np.divide(
+                    calibrated, denominator,
+                    out=np.full_like(calibrated, 1.0 / n_classes),
+                    where=denominator != 0,
+                )
+            proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+            total += proba
+        return total / self.coef.shape[0]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _linear_parts(model):
+    """Returns (kind, coef, intercept, sigmoid_a, sigmoid_b) as stacked arrays."""
+    name = type(model).__name__
+    if name == "LogisticRegression":
+        return "logistic", model.coef_[None], model.intercept_[None], None, None
+    if name == "SGDClassifier" and model.loss == "log_loss":
+        # Multiclass SGD normalizes one-vs-rest sigmoids instead of a softmax
+        return "logistic_ovr", model.coef_[None], model.intercept_[None], None, None
+
+    if name == "CalibratedClassifierCV":
+        coefs, intercepts, a, b = [], [], [], []
+        for cc in model.calibrated_classifiers_:
+            if cc.method != "sigmoid":
+                raise ValueError(f"Only sigmoid calibration can be exported, got '{cc.method}'")
+            est = cc.estimator
+            if not hasattr(est, "coef_"):
+                raise ValueError(f"Calibrated estimator {type(est).__name__} is not linear")
+            coefs.append(np.atleast_2d(est.coef_))
+            intercepts.append(np.atleast_1d(est.intercept_))
+            a.append([c.a_ for c in cc.calibrators])
+            b.append([c.b_ for c in cc.calibrators])
+        return "calibrated_sigmoid", np.stack(coefs), np.stack(intercepts), np.asarray(a), np.asarray(b)
+
+    raise ValueError(f"Cannot export model of type {name}")
+
+
+def export_linear_model(model, vectorizer, out_dir=LINEAR_MODEL_DIR, model_version=None):
+    """
+    Writes a fitted (linear model, TfidfVectorizer) pair as .npy arrays plus
+    a JSON manifest. Everything can be loaded with mmap_mode="r".
+    """
+    if vectorizer.analyzer != "word" or vectorizer.preprocessor or vectorizer.tokenizer:
+        raise ValueError("Only word analyzers with the default tokenizer can be exported")
+    if vectorizer.stop_words or vectorizer.strip_accents:
+        raise ValueError("stop_words / strip_accents are not supported by the exported vectorizer")
+
+    kind, coef, intercept, sig_a, sig_b = _linear_parts(model)
+
+    vocab = vectorizer.vocabulary_
+    terms = sorted(vocab)
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "terms.npy"), np.array(terms, dtype=str))
+    np.save(os.path.join(out_dir, "columns.npy"), np.array([vocab[t] for t in terms], dtype=np.int64))
+    if vectorizer.use_idf:
+        np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "coef.npy"), np.ascontiguousarray(coef, dtype=np.float64))
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(intercept, dtype=np.float64))
+    if sig_a is not None:
+        np.save(os.path.join(out_dir, "sigmoid_a.npy"), sig_a.astype(np.float64))
+        np.save(os.path.join(out_dir, "sigmoid_b.npy"), sig_b.astype(np.float64))
+
+    meta = {
+        "format": 1,
+        "model_version": model_version,
+        "kind": kind,
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "n_features": len(vocab),
+        "lowercase": bool(vectorizer.lowercase),
+        "ngram_range": list(vectorizer.ngram_range),
+        "token_pattern": vectorizer.token_pattern,
+        "norm": vectorizer.norm,
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "binary": bool(vectorizer.binary),
+        "use_idf": bool(vectorizer.use_idf),
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+def load_linear_model(path=LINEAR_MODEL_DIR, mmap=True):
+    """Loads an exported artifact and returns (model, vectorizer)."""
+    mode = "r" if mmap else None
+
+    def arr(name):
+        full = os.path.join(path, name)
+        return np.load(full, mmap_mode=mode) if os.path.exists(full) else None
+
+    with open(os.path.join(path, MANIFEST_NAME), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    vectorizer = MappedTfidfVectorizer(
+        meta, arr("terms.npy"), arr("columns.npy"), arr("idf.npy") if meta["use_idf"] else None
+    )
+    model = MappedLinearModel(meta, arr("coef.npy"), arr("intercept.npy"), arr("sigmoid_a.npy"), arr("sigmoid_b.npy"))
+    return model, vectorizer
+
+
+if __name__ == "__main__":
+    # One-off conversion of the legacy pickles: python linear_artifact.py [model.pkl vectorizer.pkl out_dir]
+    model_path, vec_path, out_dir = (sys.argv[1:4] + [None] * 3)[:3]
+    model_path = model_path or "svm_model.pkl"
+    vec_path = vec_path or "tfidf_vectorizer.pkl"
+    out_dir = out_dir or LINEAR_MODEL_DIR
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    with open(vec_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    export_linear_model(model, vectorizer, out_dir)
+    print(f"Exported {model_path} + {vec_path} to {out_dir}/")
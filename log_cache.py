@@ -0,0 +1,104 @@
+import os
+import json
+import threading
+
+from dotenv import load_dotenv
+
+from log_store import SQLiteLogStore, PAGE_SIZE, rewind_cursor
+
+load_dotenv()
+
+LOG_CACHE_PATH = os.getenv("LOG_CACHE_PATH", "sentiment_logs_cache.db")
+SYNC_PAGE_SIZE = PAGE_SIZE
+
+
+class LocalLogCache(SQLiteLogStore):
+    """
+    Local SQLite mirror of sentiment_logs for the admin side.
+    sync() appends only rows past the stored (created_at, id) cursor, and
+    all dashboard aggregates, trend data and exports read from this copy
+    instead of pulling the table from the log store on every page load.
+    Each sync re-reads a short overlap behind the cursor for rows that
+    committed late; rows already cached are ignored by id.
+    """
+
+    # Ids come from the source store and may not be integers
+    SCHEMA = """
+    create table if not exists sentiment_logs (
+        id primary key,
+        created_at text not null,
+        review text,
+        prediction text,
+        confidence real,
+        model_version text
+    );
+    create index if not exists sentiment_logs_created_at_id_idx on sentiment_logs (created_at, id);
+    create table if not exists sync_state (key text primary key, value text);
+    """
+
+    def __init__(self, path=LOG_CACHE_PATH):
+        super().__init__(path)
+        self._sync_thread = None
+        self.last_added = 0
+        self.sync_error = None
+
+    def cursor(self):
+        with self._lock:
+            row = self._conn.execute("select value from sync_state where key = 'cursor'").fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def sync(self, source, page_size=SYNC_PAGE_SIZE, max_pages=None):
+        """Pulls new rows from a LogStore page by page. Returns how many were added."""
+        added = pages = 0
+        cursor = rewind_cursor(self.cursor())
+        while max_pages is None or pages < max_pages:
+            rows, cursor = source.fetch_after(cursor, page_size)
+            if not rows:
+                break
+            added += self.insert_many(rows)
+            with self._lock, self._conn:
+                self._conn.execute("insert or replace into sync_state values ('cursor', ?)", (json.dumps(cursor),))
+            pages += 1
+            if len(rows) < page_size:
+                break
+        return added
+
+    @property
+    def syncing(self):
+        return self._sync_thread is not None and self._sync_thread.is_alive()
+
+    def sync_in_background(self, source, wait=0.0):
+        """
+        Runs sync(source) on a daemon thread, unless one is already running,
+        and waits up to `wait` seconds for it. An incremental sync usually
+        finishes within the wait; the first backfill of a large table keeps
+        going without blocking the caller. Returns True once it has finished.
+        """
+        if not self.syncing:
+            self._sync_thread = threading.Thread(target=self._sync_worker, args=(source,),
+                                                 name="log-cache-sync", daemon=True)
+            self._sync_thread.start()
+        self._sync_thread.join(wait)
+        return not self.syncing
+
+    def _sync_worker(self, source):
+        try:
+            self.last_added = self.sync(source)
+            self.sync_error = None
+        except Exception as e:
+            self.sync_error = str(e)
+            print(f"Warning: Log cache sync failed: {e}")
+
+
+if __name__ == "__main__":
+    # python log_cache.py [export.csv]  -- sync from the log store, optionally export
+    import sys
+    from log_store import get_log_store
+
+    cache = LocalLogCache()
+    try:
+        print(f"Synced {cache.sync(get_log_store())} new rows ({cache.row_count()} cached).")
+        if len(sys.argv) > 1:
+            print(f"Exported {cache.export_csv(sys.argv[1])} rows to {sys.argv[1]}")
+    except Exception as e:
+        print(f"Error: {e}")
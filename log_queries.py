@@ -0,0 +1,81 @@
+# Read-side queries against sentiment_logs in Supabase.
+# Aggregates run in Postgres (see sql/sentiment_log_aggregates.sql) and row
+# fetches use a (created_at, id) keyset cursor, so callers only transfer small
+# results or rows they have not seen yet.
+
+LOG_TABLE = "sentiment_logs"
+LOG_COLUMNS = "id, created_at, review, prediction, confidence, model_version"
+
+
+def _since(since):
+    return since.isoformat() if hasattr(since, "isoformat") else since
+
+
+def counts(client, since=None):
+    """[{prediction, model_version, n}] computed server-side."""
+    return client.rpc("sentiment_log_counts", {"since": _since(since)}).execute().data or []
+
+
+def label_counts(client, since=None):
+    """Exact {label: count} using only HEAD requests; works without the SQL functions."""
+    out = {}
+    for label in ("Positive", "Negative"):
+        query = client.table(LOG_TABLE).select("id", count="exact", head=True).eq("prediction", label)
+        if since is not None:
+            query = query.gte("created_at", _since(since))
+        out[label] = query.execute().count or 0
+    return out
+
+
+def time_buckets(client, bucket="hour", since=None):
+    """[{bucket_start, prediction, n}] ordered by bucket_start."""
+    params = {"bucket": bucket, "since": _since(since)}
+    return client.rpc("sentiment_log_buckets", params).execute().data or []
+
+
+def confidence_histogram(client, bins=10, since=None):
+    """[{bin, prediction, n}] with bins numbered 1..bins over [0, 1]."""
+    params = {"bins": bins, "since": _since(since)}
+    return client.rpc("sentiment_log_confidence_histogram", params).execute().data or []
+
+
+def fetch_after(client, cursor=None, limit=1000):
+    """
+    Returns (rows, cursor) for up to `limit` rows after cursor, oldest first.
+    cursor=None starts from the very first row, which makes this suitable
+    for walking (or mirroring) the whole table page by page.
+    """
+    query = client.table(LOG_TABLE).select(LOG_COLUMNS)
+    if cursor is not None and cursor[1] is None:
+        query = query.gt("created_at", cursor[0])
+    elif cursor is not None:
+        created_at, row_id = cursor
+        query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})')
+    rows = query.order("created_at").order("id").limit(limit).execute().data or []
+    if rows:
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, cursor
+
+
+def fetch_since(client, cursor=None, limit=500):
+    """
+    Returns (rows, cursor) for rows newer than cursor, oldest first.
+    With no cursor, the newest `limit` rows are returned instead. Pass the
+    returned cursor back in to fetch only what was added since.
+    """
+    if cursor is not None:
+        return fetch_after(client, cursor, limit)
+
+    rows = (
+        client.table(LOG_TABLE)
+        .select(LOG_COLUMNS)
+        .order("created_at", desc=True)
+        .order("id", desc=True)
+        .limit(limit)
+        .execute()
+        .data
+    ) or []
+    rows.reverse()
+    if rows:
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, cursor
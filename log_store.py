@@ -0,0 +1,427 @@
+import os
+import re
+import csv
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+import log_queries
+from urdu_text import clean_urdu_text
+
+load_dotenv()
+
+# Which store prediction logs go to: "supabase" (default) or "sqlite"
+LOG_STORE = os.getenv("LOG_STORE", "supabase").lower()
+LOG_STORE_PATH = os.getenv("LOG_STORE_PATH", "sentiment_logs.db")
+PAGE_SIZE = 1000
+# Seconds of rows re-read behind a cursor: concurrent writers can commit a row
+# with a created_at slightly older than rows a reader has already paged past
+LOG_CURSOR_OVERLAP = float(os.getenv("LOG_CURSOR_OVERLAP", "10"))
+COLUMNS = ["id", "created_at", "review", "prediction", "confidence", "model_version"]
+
+# SQLite expressions for the start of each time bucket (created_at is ISO-8601 text)
+BUCKET_SQL = {
+    "minute": "strftime('%Y-%m-%dT%H:%M:00', created_at)",
+    "hour": "strftime('%Y-%m-%dT%H:00:00', created_at)",
+    "day": "date(created_at)",
+    "week": "date(created_at, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', created_at)",
+}
+
+SEARCH_PAGE_SIZE = 50
+SEARCH_MIN_PREFIX = 2  # shorter prefix* terms match as whole words; one letter would expand to most of the vocabulary
+_QUERY_PARTS = re.compile(r'"([^"]*)"?|(\S+)')
+
+# Punctuation, signs and symbols inside the Arabic block survive clean_urdu_text
+# (، ؛ ؟ ۔ ٪ ۝ ...); for search they separate words like spaces do.
+_SEARCH_SEPARATORS = re.compile(r'[\u0600-\u060F\u061B-\u061F\u066A-\u066D\u06D4\u06DD\u06DE\u06E9\u06FD\u06FE]+')
+
+
+def search_text(text):
+    """Review text as the search index sees it: cleaned, with Urdu punctuation as word breaks."""
+    return " ".join(_SEARCH_SEPARATORS.sub(" ", clean_urdu_text(text)).split())
+
+
+def _search_terms(query):
+    """(text, is_prefix) per word or "phrase" of an admin search string, after search_text."""
+    terms = []
+    for phrase, word in _QUERY_PARTS.findall(query or ""):
+        if phrase:
+            tokens = search_text(phrase).split()
+            if tokens:
+                terms.append((" ".join(tokens), False))
+            continue
+        tokens = search_text(word).split()
+        terms.extend((t, False) for t in tokens)
+        if tokens and word.endswith("*") and len(tokens[-1]) >= SEARCH_MIN_PREFIX:
+            terms[-1] = (tokens[-1], True)
+    return terms
+
+
+def search_match_expression(query):
+    """
+    Turns an admin search string into an FTS5 MATCH expression over the
+    review index: words must all occur, "quoted words" must occur as a
+    phrase and word* matches any word starting with word (at least
+    SEARCH_MIN_PREFIX letters). Every part goes through search_text, exactly
+    like the indexed reviews, so the result never contains FTS5 syntax from
+    the user. None if nothing is left.
+    """
+    return " AND ".join(f'"{text}"' + (" *" if prefix else "") for text, prefix in _search_terms(query)) or None
+
+
+def search_like_patterns(query):
+    """
+    The same query as LIKE patterns (escaped with \\) over
+    ' ' || search_text(review) || ' ', for SQLite builds without FTS5.
+    """
+    patterns = []
+    for text, prefix in _search_terms(query):
+        text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        patterns.append(f"% {text}%" if prefix else f"% {text} %")
+    return patterns
+
+
+_fts5 = None
+
+
+def fts5_available(conn):
+    """
+    Whether this process's SQLite library has FTS5. Not every build does
+    (e.g. the one TensorFlow loads first), so it is checked once per process.
+    """
+    global _fts5
+    if _fts5 is None:
+        try:
+            conn.execute("create virtual table temp.fts5_probe using fts5(x)")
+            conn.execute("drop table temp.fts5_probe")
+            _fts5 = True
+        except sqlite3.OperationalError:
+            print("Warning: SQLite has no FTS5; log search falls back to scanning the table.")
+            _fts5 = False
+    return _fts5
+
+
+def rewind_cursor(cursor, seconds=LOG_CURSOR_OVERLAP):
+    """
+    A cursor `seconds` before cursor, for re-reading rows that committed late
+    behind it. Callers drop the rows they already have by id.
+    """
+    if cursor is None:
+        return None
+    created_at = datetime.fromisoformat(str(cursor[0]).replace("Z", "+00:00"))
+    return ((created_at - timedelta(seconds=seconds)).isoformat(), None)
+
+
+class LogStore(ABC):
+    """
+    Storage interface for prediction logs.
+    Rows are dicts with the COLUMNS keys; cursors are (created_at, id)
+    tuples, where an id of None means "after created_at"; aggregates
+    return the same row shapes as the Supabase SQL functions in
+    sql/sentiment_log_aggregates.sql.
+    """
+
+    @abstractmethod
+    def insert_many(self, rows):
+        """Writes a list of log rows in one round trip / transaction."""
+
+    @abstractmethod
+    def fetch_after(self, cursor=None, limit=PAGE_SIZE):
+        """(rows, cursor) for up to `limit` rows after cursor, oldest first."""
+
+    @abstractmethod
+    def fetch_since(self, cursor=None, limit=500):
+        """Like fetch_after, but with no cursor returns the newest `limit` rows."""
+
+    @abstractmethod
+    def counts(self, since=None):
+        pass
+
+    @abstractmethod
+    def time_buckets(self, bucket="hour", since=None):
+        pass
+
+    @abstractmethod
+    def confidence_histogram(self, bins=10, since=None):
+        pass
+
+
+class SupabaseLogStore(LogStore):
+    """sentiment_logs in Supabase: writes with the admin key, reads with the anon key."""
+
+    def __init__(self, read_client=None, write_client=None):
+        self._read_client = read_client
+        self._write_client = write_client
+
+    @property
+    def read_client(self):
+        if self._read_client is None:
+            from db import get_public_client
+            self._read_client = get_public_client()
+        return self._read_client
+
+    @property
+    def write_client(self):
+        if self._write_client is None:
+            from db import get_admin_client
+            self._write_client = get_admin_client()
+            if self._write_client is None:
+                raise RuntimeError("Admin client not initialized")
+        return self._write_client
+
+    def insert_many(self, rows):
+        self.write_client.table(log_queries.LOG_TABLE).insert(rows).execute()
+
+    def fetch_after(self, cursor=None, limit=PAGE_SIZE):
+        return log_queries.fetch_after(self.read_client, cursor, limit)
+
+    def fetch_since(self, cursor=None, limit=500):
+        return log_queries.fetch_since(self.read_client, cursor, limit)
+
+    def counts(self, since=None):
+        return log_queries.counts(self.read_client, since)
+
+    def label_counts(self, since=None):
+        return log_queries.label_counts(self.read_client, since)
+
+    def time_buckets(self, bucket="hour", since=None):
+        return log_queries.time_buckets(self.read_client, bucket, since)
+
+    def confidence_histogram(self, bins=10, since=None):
+        return log_queries.confidence_histogram(self.read_client, bins, since)
+
+
+class SQLiteLogStore(LogStore):
+    """
+    Embedded sentiment_logs in a local SQLite file (WAL mode).
+    For edge deployments and load tests: a batch insert is one local
+    transaction instead of a network round trip.
+    """
+
+    SCHEMA = """
+    create table if not exists sentiment_logs (
+        id integer primary key,
+        created_at text not null,
+        review text,
+        prediction text,
+        confidence real,
+        model_version text
+    );
+    create index if not exists sentiment_logs_created_at_id_idx on sentiment_logs (created_at, id);
+    """
+
+    # Inverted index over search_text(review): Urdu words separated by single
+    # spaces, so the ascii tokenizer splits exactly on those spaces.
+    # Contentless: the review text itself stays in sentiment_logs only.
+    # Bump SEARCH_INDEX_VERSION when the indexed text changes; the index is rebuilt on open.
+    # Without FTS5 there is no index and search() scans search_text(review) with LIKE.
+    SEARCH_INDEX_VERSION = 2
+    SEARCH_SCHEMA = """
+    create virtual table if not exists review_index using fts5(review, tokenize = 'ascii', content = '', prefix = '2 3');
+    """
+
+    def __init__(self, path=LOG_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.create_function("search_text", 1, search_text, deterministic=True)
+        self.full_text_search = fts5_available(self._conn)
+        if self.full_text_search:
+            if self._conn.execute("pragma user_version").fetchone()[0] < self.SEARCH_INDEX_VERSION:
+                self._conn.execute("drop table if exists review_index")
+                self._conn.execute(f"pragma user_version = {self.SEARCH_INDEX_VERSION}")
+            self._conn.executescript(self.SEARCH_SCHEMA)
+            self.index_reviews()
+
+    def insert_many(self, rows):
+        # New rows are stamped under the write lock, so created_at order is commit order;
+        # rows copied from another store (LocalLogCache) keep theirs
+        with self._lock, self._conn:
+            now = datetime.now(timezone.utc).isoformat()
+            values = [
+                (r.get("id"), r.get("created_at") or now, r.get("review"), r.get("prediction"),
+                 r.get("confidence"), r.get("model_version"))
+                for r in rows
+            ]
+            inserted = self._conn.executemany("insert or ignore into sentiment_logs values (?, ?, ?, ?, ?, ?)", values).rowcount
+        self.index_reviews()
+        return inserted
+
+    def index_reviews(self):
+        """
+        Adds reviews stored since the last call to the search index.
+        The index follows the table's rowid, so this only ever touches new rows.
+        """
+        if not self.full_text_search:
+            return 0
+        with self._lock, self._conn:
+            last = self._conn.execute("select rowid from review_index order by rowid desc limit 1").fetchone()
+            cur = self._conn.execute(
+                "insert into review_index (rowid, review) "
+                "select rowid, search_text(coalesce(review, '')) from sentiment_logs where rowid > ?",
+                (last[0] if last else 0,),
+            )
+            return cur.rowcount
+
+    def search(self, query="", label=None, model_version=None, since=None, until=None, before=None,
+               limit=SEARCH_PAGE_SIZE):
+        """
+        Finds logged reviews by words, "phrases" and prefix* terms (see
+        search_match_expression), optionally filtered by label, model
+        version and a created_at range [since, until). Newest first, one
+        page at a time: pass the returned cursor as before for the next
+        page (None when there is none).
+        """
+        match = search_match_expression(query) if self.full_text_search else None
+        if match:
+            # Ordering and paging on the index's own rowid lets FTS5 walk its
+            # postings newest first and stop after one page, however common the term
+            sql = "from review_index join sentiment_logs l on l.rowid = review_index.rowid where review_index match ?"
+            params = [match]
+            order = "review_index.rowid"
+        else:
+            sql = "from sentiment_logs l where 1 = 1"
+            params = []
+            order = "l.rowid"
+            if not self.full_text_search:
+                for pattern in search_like_patterns(query):
+                    sql += " and ' ' || search_text(coalesce(l.review, '')) || ' ' like ? escape '\\'"
+                    params.append(pattern)
+        for clause, value in (
+            ("l.prediction = ?", label),
+            ("l.model_version = ?", model_version),
+            ("l.created_at >= ?", since.isoformat() if hasattr(since, "isoformat") else since),
+            ("l.created_at < ?", until.isoformat() if hasattr(until, "isoformat") else until),
+            (f"{order} < ?", before),
+        ):
+            if value is not None:
+                sql += f" and {clause}"
+                params.append(value)
+
+        columns = ", ".join(f"l.{c}" for c in COLUMNS)
+        rows = self._query(f"select l.rowid as _rowid, {columns} {sql} order by {order} desc limit ?", params + [limit + 1])
+        cursor = rows[limit - 1]["_rowid"] if len(rows) > limit else None
+        for row in rows:
+            del row["_rowid"]
+        return rows[:limit], cursor
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    @staticmethod
+    def _since_clause(since):
+        if since is None:
+            return [], []
+        return ["created_at >= ?"], [since.isoformat() if hasattr(since, "isoformat") else since]
+
+    def _where(self, since=None, cursor=None):
+        clauses, params = self._since_clause(since)
+        if cursor is not None and cursor[1] is None:
+            clauses.append("created_at > ?")
+            params.append(cursor[0])
+        elif cursor is not None:
+            clauses.append("(created_at > ? or (created_at = ? and id > ?))")
+            params += [cursor[0], cursor[0], cursor[1]]
+        return (f"where {' and '.join(clauses)}" if clauses else ""), params
+
+    def fetch_after(self, cursor=None, limit=PAGE_SIZE, since=None):
+        where, params = self._where(since, cursor)
+        rows = self._query(
+            f"select {', '.join(COLUMNS)} from sentiment_logs {where} order by created_at, id limit ?",
+            params + [limit],
+        )
+        if rows:
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        return rows, cursor
+
+    def fetch_since(self, cursor=None, limit=500):
+        if cursor is not None:
+            return self.fetch_after(cursor, limit)
+        rows = self.recent(limit)
+        rows.reverse()
+        return rows, ((rows[-1]["created_at"], rows[-1]["id"]) if rows else None)
+
+    def counts(self, since=None):
+        where, params = self._where(since)
+        return self._query(
+            f"select prediction, model_version, count(*) as n from sentiment_logs {where} "
+            f"group by prediction, model_version",
+            params,
+        )
+
+    def time_buckets(self, bucket="hour", since=None):
+        where, params = self._where(since)
+        return self._query(
+            f"select {BUCKET_SQL[bucket]} as bucket_start, prediction, count(*) as n from sentiment_logs {where} "
+            f"group by 1, 2 order by 1",
+            params,
+        )
+
+    def confidence_histogram(self, bins=10, since=None):
+        where, params = self._where(since)
+        return self._query(
+            f"select min(max(cast(confidence * ? as integer) + 1, 1), ?) as bin, prediction, count(*) as n "
+            f"from sentiment_logs {where} group by 1, 2 order by 1",
+            [bins, bins] + params,
+        )
+
+    def recent(self, limit=1000):
+        return self._query(
+            f"select {', '.join(COLUMNS)} from sentiment_logs order by created_at desc, id desc limit ?",
+            (limit,),
+        )
+
+    def row_count(self):
+        return self._query("select count(*) as n from sentiment_logs")[0]["n"]
+
+    def iter_rows(self, since=None, page_size=PAGE_SIZE):
+        """Yields rows oldest first using keyset pages, never loading the whole table."""
+        cursor = None
+        while True:
+            rows, cursor = self.fetch_after(cursor, page_size, since=since)
+            if not rows:
+                return
+            yield from rows
+
+    def export_csv(self, path, since=None):
+        """Streams the stored logs into a CSV file. Returns the number of rows written."""
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            for row in self.iter_rows(since):
+                writer.writerow(row)
+                written += 1
+        return written
+
+    def close(self):
+        self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_log_store():
+    """Returns the process-wide LogStore selected by LOG_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if LOG_STORE == "sqlite":
+                    _store = SQLiteLogStore(LOG_STORE_PATH)
+                elif LOG_STORE == "supabase":
+                    _store = SupabaseLogStore()
+                else:
+                    raise ValueError(f"Unknown LOG_STORE '{LOG_STORE}' (expected 'supabase' or 'sqlite')")
+    return _store
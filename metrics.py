@@ -0,0 +1,155 @@
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds (upper bounds), from 50us to 5s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, v) for labels, v in self._values.items()]
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q, *labels):
+        """Estimates a quantile by interpolating inside the matching bucket."""
+        series = self._series.get(labels)
+        if not series:
+            return None
+        counts = series[0]
+        total = sum(counts)
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for labels, (counts, total) in self._series.items():
+                cumulative = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    out.append((self.name + "_bucket", labels + (("+Inf" if bound == float("inf") else repr(bound)),), cumulative))
+                out.append((self.name + "_sum", labels, total))
+                out.append((self.name + "_count", labels, cumulative))
+        return out
+
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    def __init__(self, name, help_text, fn):
+        self.name = name
+        self.help = help_text
+        self.labelnames = ()
+        self.fn = fn
+
+    def samples(self):
+        return [(self.name, (), self.fn())]
+
+
+_registry = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def counter(name, help_text, labelnames=()):
+    return _register(Counter(name, help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+
+def gauge(name, help_text, fn):
+    return _register(Gauge(name, help_text, fn))
+
+
+def _format_labels(names, values):
+    if not values:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def render():
+    """Prometheus text exposition format for every registered metric."""
+    lines = []
+    for metric in _registry:
+        kind = type(metric).__name__.lower()
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {kind}")
+        for name, labels, value in metric.samples():
+            names = metric.labelnames + (("le",) if name.endswith("_bucket") else ())
+            lines.append(f"{name}{_format_labels(names, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Inference metrics ---
+# "logging" is the bulk insert on the logger's writer thread, not part of "total"
+STAGES = ("clean", "vectorize", "model", "logging", "total")
+
+stage_latency = histogram(
+    "sentiment_stage_latency_seconds", "Time spent per batch in each inference stage", ("stage",)
+)
+predictions_total = counter("sentiment_predictions_total", "Predictions returned, by label", ("label",))
+empty_inputs_total = counter("sentiment_empty_inputs_total", "Inputs that were empty after cleaning")
+batches_total = counter("sentiment_batches_total", "Calls to predict_sentiment_batch")
+log_failures_total = counter("sentiment_log_write_failures_total", "Failed bulk writes to the log store")
+log_dropped_total = counter("sentiment_log_dropped_total", "Log records dropped because the queue was full")
+
+# --- Cascade (see cascade.py) ---
+TIERS = ("linear", "bilstm")
+
+tier_predictions_total = counter("sentiment_cascade_predictions_total", "Cascade predictions, by answering tier", ("tier",))
+tier_latency = histogram(
+    "sentiment_cascade_tier_latency_seconds", "Time spent per batch in each cascade tier", ("tier",)
+)
@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from urdu_text import clean_urdu_texts
+
+load_dotenv()
+
+# Versioned model artifacts (override through the environment / .env)
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models")
+REGISTRY_MANIFEST = "registry.json"
+REGISTRY_POLL_INTERVAL = float(os.getenv("REGISTRY_POLL_INTERVAL", "10"))
+MODEL_PIN = os.getenv("MODEL_PIN") or None  # serve this version whatever the manifest says
+
+MODEL_TYPES = ("linear", "bilstm")
+
+# Run through a linear version before it takes traffic to page in its memory-mapped
+# arrays, so the first real request is not the slow one (a BiLSTM builds every graph instead)
+WARMUP_TEXTS = [
+    "بہت اچھا",
+    "یہ فلم بہت اچھی ہے",
+    "یہ بالکل فضول ہے اور وقت کا ضیاع",
+    " ".join(["کہانی اچھی تھی مگر اداکاری کمزور تھی"] * 3),
+    " ".join(["کھانا مزیدار تھا سروس بہت اچھی تھی"] * 8),
+    " ".join(["یہ فلم بہت لمبی اور بور تھی"] * 25),
+]
+
+
+def _manifest_path(root):
+    return os.path.join(root, REGISTRY_MANIFEST)
+
+
+def _write_json_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_manifest(root=MODEL_REGISTRY_DIR):
+    """{"current": version, "versions": {version: {"type", "path", "created_at"}}}, or None without a registry."""
+    try:
+        with open(_manifest_path(root), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def publish(src_dir, version, model_type="linear", root=MODEL_REGISTRY_DIR, promote_now=True):
+    """
+    Copies an exported artifact directory (linear_model/ or bilstm_tflite/)
+    into the registry as version and, by default, makes it current.
+    The copy is completed under a temporary name first, so a watcher never
+    sees a half-written version.
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unknown model type '{model_type}', expected one of {', '.join(MODEL_TYPES)}")
+    os.makedirs(root, exist_ok=True)
+    manifest = read_manifest(root) or {"current": None, "versions": {}}
+    if version in manifest["versions"]:
+        raise ValueError(f"Version '{version}' is already registered")
+
+    dest = os.path.join(root, version)
+    tmp = f"{dest}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(src_dir, tmp)
+    os.replace(tmp, dest)
+
+    manifest["versions"][version] = {
+        "type": model_type,
+        "path": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if promote_now or manifest["current"] is None:
+        manifest["current"] = version
+    _write_json_atomic(_manifest_path(root), manifest)
+    return dest
+
+
+def promote(version, root=MODEL_REGISTRY_DIR):
+    """Points current at an already registered version (also used to roll back)."""
+    manifest = read_manifest(root)
+    if not manifest or version not in manifest["versions"]:
+        raise ValueError(f"Version '{version}' is not registered")
+    manifest["current"] = version
+    _write_json_atomic(_manifest_path(root), manifest)
+
+
+def load_version(version, entry, root=MODEL_REGISTRY_DIR):
+    """Loads one registered version and returns (model, vectorizer) stamped with its version."""
+    path = os.path.join(root, entry["path"])
+    if entry["type"] == "bilstm":
+        from bilstm_engine import load_bilstm
+        model, vectorizer = load_bilstm(path)
+    else:
+        from linear_artifact import load_linear_model
+        model, vectorizer = load_linear_model(path)
+    model.model_version = version
+    return model, vectorizer
+
+
+def load_current(root=MODEL_REGISTRY_DIR, pin=MODEL_PIN):
+    """
+    Loads the current (or pinned) version once, with no watcher thread.
+    For batch jobs that score a whole input with one version.
+    """
+    manifest = read_manifest(root)
+    if manifest is None:
+        raise FileNotFoundError(_manifest_path(root))
+    version = pin or manifest["current"]
+    if version not in manifest["versions"]:
+        raise ValueError(f"Version '{version}' is not registered")
+    return load_version(version, manifest["versions"][version], root)
+
+
+class ModelHandle:
+    """One loaded version plus the number of requests currently using it."""
+
+    def __init__(self, version, model, vectorizer):
+        self.version = version
+        self.model = model
+        self.vectorizer = vectorizer
+        self.in_flight = 0
+        self.retired = False
+
+
+class ModelRegistry:
+    """
+    Serves the current registry version and hot-swaps it without downtime.
+    A watcher thread notices manifest changes, loads the new version and
+    warms it off the request path, then swaps it in under a lock. Requests
+    take a lease(): one that started on the old version keeps it until it
+    finishes, and the old version is released once its last lease ends.
+    """
+
+    def __init__(self, root=MODEL_REGISTRY_DIR, pin=MODEL_PIN, poll_interval=REGISTRY_POLL_INTERVAL):
+        self.root = root
+        self.pin = pin
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._current = None
+        self._retiring = []
+        self._manifest_mtime = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.swaps = 0
+        self.last_error = None
+        if not self.refresh():
+            raise FileNotFoundError(f"No loadable model in registry {root}/: {self.last_error}")
+
+    @property
+    def current(self):
+        return self._current
+
+    def target_version(self):
+        if self.pin:
+            return self.pin
+        manifest = read_manifest(self.root)
+        return manifest["current"] if manifest else None
+
+    def refresh(self):
+        """Loads, warms and swaps in the target version if it changed. Returns False on failure."""
+        with self._load_lock:
+            try:
+                manifest = read_manifest(self.root)
+                if manifest is None:
+                    raise FileNotFoundError(_manifest_path(self.root))
+                version = self.pin or manifest["current"]
+                if self._current is not None and self._current.version == version:
+                    return True
+                if version not in manifest["versions"]:
+                    raise ValueError(f"Version '{version}' is not registered")
+
+                start = time.perf_counter()
+                model, vectorizer = load_version(version, manifest["versions"][version], self.root)
+                self._warm(model, vectorizer)
+                print(f"Model registry: {version} loaded and warmed in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: Model registry could not load a new version, keeping the current one: {e}")
+                return False
+
+            handle = ModelHandle(version, model, vectorizer)
+            with self._lock:
+                old, self._current = self._current, handle
+                if old is not None:
+                    old.retired = True
+                    self._retiring.append(old)
+                    self._release_idle()
+                    self.swaps += 1
+            self.last_error = None
+            return True
+
+    @staticmethod
+    def _warm(model, vectorizer):
+        # Straight through the model: no cache, no prediction logs and no serving metrics
+        if hasattr(model, "warm"):
+            model.warm()
+        else:
+            model.predict_proba(vectorizer.transform(clean_urdu_texts(WARMUP_TEXTS)))
+
+    def _release_idle(self):
+        # Caller holds self._lock. Dropping the references lets the old arrays / interpreters be freed.
+        for handle in [h for h in self._retiring if h.in_flight == 0]:
+            handle.model = handle.vectorizer = None
+            self._retiring.remove(handle)
+
+    @contextmanager
+    def lease(self):
+        """Yields the current ModelHandle and keeps it alive until the block exits."""
+        with self._lock:
+            handle = self._current
+            handle.in_flight += 1
+        try:
+            yield handle
+        finally:
+            with self._lock:
+                handle.in_flight -= 1
+                if handle.retired:
+                    self._release_idle()
+
+    # --- Watcher ---
+    def start_watcher(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                mtime = os.path.getmtime(_manifest_path(self.root))
+            except OSError:
+                continue
+            if mtime != self._manifest_mtime:
+                # A version that fails to load is not retried until the manifest changes again
+                self._manifest_mtime = mtime
+                self.refresh()
+
+    def info(self):
+        with self._lock:
+            return {
+                "version": self._current.version,
+                "pinned": self.pin,
+                "in_flight": self._current.in_flight,
+                "retiring": {h.version: h.in_flight for h in self._retiring},
+                "swaps": self.swaps,
+                "last_error": self.last_error,
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the process-wide ModelRegistry with its watcher running, or
+    None when MODEL_REGISTRY_DIR has no manifest (the fixed-path models are used then).
+    """
+    global _registry
+    if _registry is None and read_manifest(MODEL_REGISTRY_DIR) is not None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry().start_watcher()
+    return _registry
+
+
+if __name__ == "__main__":
+    # python model_registry.py list
+    # python model_registry.py publish <artifact_dir> <version> [linear|bilstm] [--no-promote]
+    # python model_registry.py promote <version>
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    try:
+        if args[:1] == ["publish"] and len(args) >= 3:
+            dest = publish(args[1], args[2], args[3] if len(args) > 3 else "linear",
+                           promote_now="--no-promote" not in sys.argv)
+            print(f"Published {args[1]} as {args[2]} ({dest})")
+        elif args[:1] == ["promote"] and len(args) == 2:
+            promote(args[1])
+            print(f"{args[1]} is now current")
+        else:
+            manifest = read_manifest() or {"current": None, "versions": {}}
+            for version, entry in sorted(manifest["versions"].items(), key=lambda kv: kv[1]["created_at"]):
+                marker = "*" if version == manifest["current"] else " "
+                print(f"{marker} {version:<30} {entry['type']:<8} {entry['created_at']}")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
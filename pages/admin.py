@@ -1,21 +1,29 @@
 import sys
 import os
+import time
+import tempfile
+import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
 import pandas as pd
-from db import supabase_public
+import plotly.express as px
+import metrics
+from log_cache import LocalLogCache
+from log_store import get_log_store, rewind_cursor, LOG_STORE
 from auth import login, signup, logout
 
+RECENT_LOGS = 1000
+SYNC_INTERVAL = 30  # seconds between automatic cache syncs
+SYNC_WAIT = 2.0  # seconds a rerun waits for a sync before showing the cached data
+
 # -------- Session state --------
 if "user" not in st.session_state:
     st.session_state.user = None
 
-# Restore session from Supabase client if available
-if st.session_state.user is None:
-    session = supabase_public.auth.get_session()
-    if session:
-        st.session_state.user = session.user
+# No restore from the Supabase client: it is shared by every session of this
+# process, so it would sign a new visitor in as whoever signed in last.
+# A signed-in user stays signed in for the browser session (auth.login).
 
 # -------- Login / Signup UI --------
 def auth_ui():
@@ -60,27 +68,214 @@ def dashboard():
 
     st.title("Sentiment Admin Dashboard")
 
+    store = get_log_store()
+
+    # One local mirror per server process, shared by every admin session
+    @st.cache_resource
+    def get_log_cache():
+        return LocalLogCache()
+
+    def load_cached_summary(cache, bucket):
+        return {
+            "counts": pd.DataFrame(cache.counts()),
+            "buckets": pd.DataFrame(cache.time_buckets(bucket)),
+            "histogram": pd.DataFrame(cache.confidence_histogram()),
+        }
+
+    # Aggregates are computed by the store (Postgres or SQLite); only a few rows come back
     @st.cache_data(ttl=30)
-    def load_logs():
-        data = (
-            supabase_public
-            .table("sentiment_logs")
-            .select("*")
-            .order("created_at", desc=True)
-            .limit(1000)
-            .execute()
-            .data
+    def load_summary(bucket):
+        try:
+            return {
+                "counts": pd.DataFrame(store.counts()),
+                "buckets": pd.DataFrame(store.time_buckets(bucket)),
+                "histogram": pd.DataFrame(store.confidence_histogram()),
+            }
+        except Exception as e:
+            if not hasattr(store, "label_counts"):
+                raise
+            # Supabase SQL functions not installed yet: fall back to exact HEAD counts
+            print(f"Warning: aggregate RPC failed, using label counts only: {e}")
+            labels = store.label_counts()
+            counts = pd.DataFrame(
+                [{"prediction": k, "model_version": None, "n": v} for k, v in labels.items()]
+            )
+            return {"counts": counts, "buckets": pd.DataFrame(), "histogram": pd.DataFrame()}
+
+    # Recent rows are fetched incrementally: each refresh only asks for rows past the cursor,
+    # re-reading a short overlap for rows that committed late behind it
+    def refresh_recent_logs():
+        recent = st.session_state.get("recent_logs", pd.DataFrame())
+        rows, cursor = store.fetch_since(rewind_cursor(st.session_state.get("logs_cursor")), limit=RECENT_LOGS)
+        if len(rows) >= RECENT_LOGS:
+            # More arrived than the table holds: jump to the newest rows instead of paging through the backlog
+            rows, cursor = store.fetch_since(None, limit=RECENT_LOGS)
+            recent = pd.DataFrame()
+        if rows:
+            st.session_state.logs_cursor = cursor
+            recent = pd.concat([recent, pd.DataFrame(rows)], ignore_index=True)
+            recent = recent.drop_duplicates("id", keep="last").sort_values(["created_at", "id"])
+            st.session_state.recent_logs = recent.tail(RECENT_LOGS).reset_index(drop=True)
+        return st.session_state.get("recent_logs", pd.DataFrame())
+
+    # Shown while a long sync runs; the page reruns with the new rows once it is done
+    def sync_status(cache):
+        if cache.syncing:
+            st.caption(f"Syncing the local cache in the background: {cache.row_count():,} rows so far")
+        elif st.session_state.pop("log_cache_syncing", False):
+            st.rerun()
+        st.session_state.log_cache_syncing = cache.syncing
+
+    # Word / phrase / prefix search over the review index, one page at a time
+    def search_panel(index_store, versions):
+        c1, c2, c3, c4 = st.columns([3, 1, 1, 2])
+        query = c1.text_input("Search reviews", placeholder='words, "a phrase" or prefix*', key="log_search_query")
+        label = c2.selectbox("Label", ["Any", "Positive", "Negative"], key="log_search_label")
+        version = c3.selectbox("Model version", ["Any"] + versions, key="log_search_version")
+        dates = c4.date_input("Date range", value=(), key="log_search_dates")
+
+        filters = (query, label, version, tuple(dates))
+        if st.session_state.get("log_search_filters") != filters:
+            st.session_state.log_search_filters = filters
+            st.session_state.log_search_pages = [None]  # "before" cursor of every page seen so far
+        pages = st.session_state.log_search_pages
+
+        since = until = None
+        if len(dates) == 2:
+            since, until = dates[0].isoformat(), (dates[1] + datetime.timedelta(days=1)).isoformat()
+        start = time.perf_counter()
+        rows, cursor = index_store.search(
+            query,
+            label=None if label == "Any" else label,
+            model_version=None if version == "Any" else version,
+            since=since, until=until, before=pages[-1],
+        )
+        st.caption(f"Page {len(pages)} · {len(rows)} rows · {(time.perf_counter() - start) * 1000:.0f} ms")
+        if not index_store.full_text_search:
+            st.caption("This SQLite build has no FTS5: search scans every row instead of using the review index.")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+        p1, p2 = st.columns(2)
+        if len(pages) > 1 and p1.button("← Newer", key="log_search_prev"):
+            pages.pop()
+            st.rerun()
+        if cursor is not None and p2.button("Older →", key="log_search_next"):
+            pages.append(cursor)
+            st.rerun()
+
+    # An embedded SQLite store is already local; the mirror only helps in front of Supabase
+    sources = ["Local cache", "Log store (live)"] if LOG_STORE == "supabase" else ["Log store (live)"]
+    source = st.sidebar.radio("Data source", sources)
+    bucket = st.sidebar.selectbox("Trend bucket", ["hour", "day", "week", "month"], index=1)
+
+    if source == "Local cache":
+        cache = get_log_cache()
+        # Incremental sync: only rows past the cache's cursor are downloaded. It runs on a
+        # background thread, so the first backfill of a large table never blocks the page.
+        if st.sidebar.button("Sync now") or time.time() - getattr(cache, "last_sync", 0) > SYNC_INTERVAL:
+            cache.last_sync = time.time()
+            if cache.sync_in_background(store, wait=SYNC_WAIT) and cache.last_added:
+                st.sidebar.caption(f"Synced {cache.last_added} new rows")
+        if cache.sync_error:
+            st.sidebar.warning(f"Sync failed, showing cached data: {cache.sync_error}")
+        st.fragment(sync_status, run_every=2.0 if cache.syncing else None)(cache)
+        summary = load_cached_summary(cache, bucket)
+    else:
+        summary = load_summary(bucket)
+    counts = summary["counts"]
+
+    total = int(counts["n"].sum()) if not counts.empty else 0
+    by_label = counts.groupby("prediction")["n"].sum() if not counts.empty else pd.Series(dtype=int)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Logs", total)
+    col2.metric("Positive", int(by_label.get("Positive", 0)))
+    col3.metric("Negative", int(by_label.get("Negative", 0)))
+
+    if not counts.empty and counts["model_version"].notna().any():
+        st.subheader("By model version")
+        st.dataframe(
+            counts.pivot_table(index="model_version", columns="prediction", values="n", aggfunc="sum", fill_value=0),
+            use_container_width=True,
+        )
+
+    if not summary["buckets"].empty:
+        st.subheader(f"Predictions per {bucket}")
+        st.plotly_chart(
+            px.line(summary["buckets"], x="bucket_start", y="n", color="prediction"),
+            use_container_width=True,
+        )
+
+    if not summary["histogram"].empty:
+        st.subheader("Confidence distribution")
+        st.plotly_chart(
+            px.bar(summary["histogram"], x="bin", y="n", color="prediction", barmode="group"),
+            use_container_width=True,
         )
-        return pd.DataFrame(data)
 
-    df = load_logs()
+    with st.expander("Inference metrics (this server process)"):
+        stage_rows = []
+        for stage in metrics.STAGES:
+            n = metrics.stage_latency.count(stage)
+            if n:
+                stage_rows.append({
+                    "stage": stage,
+                    "batches": n,
+                    "p50 ms": round(metrics.stage_latency.quantile(0.5, stage) * 1000, 3),
+                    "p99 ms": round(metrics.stage_latency.quantile(0.99, stage) * 1000, 3),
+                })
+        if stage_rows:
+            st.dataframe(pd.DataFrame(stage_rows), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No predictions served by this process yet.")
+
+        predicted = sum(metrics.predictions_total.value(l) for l in ("Positive", "Negative", "Neutral"))
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Predictions", predicted)
+        m2.metric("Empty / Neutral rate",
+                  f"{metrics.empty_inputs_total.value() / predicted:.1%}" if predicted else "-")
+        m3.metric("Log write failures", metrics.log_failures_total.value())
+
+        tier_rows = [
+            {
+                "tier": tier,
+                "predictions": metrics.tier_predictions_total.value(tier),
+                "p50 ms": round(metrics.tier_latency.quantile(0.5, tier) * 1000, 3),
+                "p99 ms": round(metrics.tier_latency.quantile(0.99, tier) * 1000, 3),
+            }
+            for tier in metrics.TIERS if metrics.tier_latency.count(tier)
+        ]
+        if tier_rows:
+            st.caption("Cascade tiers")
+            st.dataframe(pd.DataFrame(tier_rows), use_container_width=True, hide_index=True)
+        st.caption("Prometheus scrape endpoint: GET /metrics on the API service (api.py).")
+
+    st.subheader("Search logs")
+    searchable = cache if source == "Local cache" else store
+    if hasattr(searchable, "search"):
+        versions = sorted(counts["model_version"].dropna().unique()) if not counts.empty else []
+        search_panel(searchable, versions)
+    else:
+        st.caption("Search runs on the local cache; select 'Local cache' as the data source.")
 
-    st.metric("Total Logs", len(df))
-    if not df.empty:
-        st.metric("Positive", (df["prediction"] == "Positive").sum())
-        st.metric("Negative", (df["prediction"] == "Negative").sum())
+    st.subheader("Latest logs")
+    if source == "Local cache":
+        st.dataframe(pd.DataFrame(cache.recent(RECENT_LOGS)), use_container_width=True)
 
-    st.dataframe(df, use_container_width=True)
+        if st.button("Prepare CSV export"):
+            # A private file per export (mode 0600), gone once its bytes are handed to the download button
+            with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+                path = f.name
+            try:
+                rows = cache.export_csv(path)
+                with open(path, "rb") as f:
+                    data = f.read()
+            finally:
+                os.remove(path)
+            st.download_button(f"Download {rows} rows", data, file_name="sentiment_logs.csv", mime="text/csv")
+    else:
+        df = refresh_recent_logs()
+        st.dataframe(df.iloc[::-1], use_container_width=True)
 
 # -------- Routing --------
 if st.session_state.user is None:
@@ -1,46 +1,140 @@
+import os
 import streamlit as st
 import backend
 import time
-from db import supabase_public
+import startup_profile
+from chat_store import ChatStore, get_chat_store, make_title
+from upload_jobs import csv_columns, read_texts, start_upload_job
 
 # --- Helper Functions for Chat Management ---
+CHATS_PER_PAGE = 20
+
+def _user_id():
+    """Key the chat history is stored under"""
+    user = st.session_state.user
+    if user:
+        return getattr(user, "id", None) or user.email
+    return "anon"
+
+def _chat_store():
+    """Signed-in users get the shared chat store; anonymous chats only live as long as the session"""
+    if st.session_state.user:
+        return get_chat_store()
+    if "anon_chat_store" not in st.session_state:
+        st.session_state.anon_chat_store = ChatStore(":memory:")
+    return st.session_state.anon_chat_store
+
+def _chat_index():
+    """Titles-only index of the user's chats, built once per session and kept up to date"""
+    user_id = _user_id()
+    if st.session_state.get("chat_index_user") != user_id:
+        if "chat_index_user" in st.session_state:
+            # Signed in or out: the open chat is stored again, as a new chat of the new user
+            st.session_state.current_chat_id = None
+            st.session_state.saved_count = 0
+        st.session_state.chat_index = _chat_store().index(user_id)
+        st.session_state.chat_index_user = user_id
+    return st.session_state.chat_index
+
 def create_new_chat():
-    """Creates a new chat session"""
-    # Save current chat if it has messages
-    if st.session_state.messages and st.session_state.current_chat_id:
-        save_current_chat()
-    
-    # Create new chat
-    st.session_state.chat_counter += 1
-    new_chat_id = f"chat_{st.session_state.chat_counter}"
-    st.session_state.current_chat_id = new_chat_id
+    """Starts a new chat; it is stored once it has a message"""
+    save_current_chat()
+    st.session_state.current_chat_id = None
     st.session_state.messages = []
+    st.session_state.saved_count = 0
     
 def save_current_chat():
-    """Saves the current chat to history"""
-    if st.session_state.current_chat_id and st.session_state.messages:
-        # Generate title from first user message
-        title = "New Chat"
-        for msg in st.session_state.messages:
-            if msg["role"] == "user":
-                title = msg["content"][:30] + ("..." if len(msg["content"]) > 30 else "")
-                break
-        
-        st.session_state.chat_history[st.session_state.current_chat_id] = {
-            "title": title,
-            "messages": st.session_state.messages.copy()
-        }
+    """Persists the messages of the current chat that are not stored yet"""
+    messages = st.session_state.messages
+    if not messages or st.session_state.saved_count >= len(messages):
+        return
+    store, user_id, index = _chat_store(), _user_id(), _chat_index()
 
-def load_chat(chat_id):
-    """Loads a chat from history"""
-    # Save current chat first
-    if st.session_state.messages and st.session_state.current_chat_id:
-        save_current_chat()
-    
-    # Load selected chat
-    if chat_id in st.session_state.chat_history:
+    chat_id = st.session_state.current_chat_id
+    if chat_id is None:
+        title = make_title(messages)
+        chat_id = store.create_chat(user_id, title)
+        index.add(chat_id, title)
         st.session_state.current_chat_id = chat_id
-        st.session_state.messages = st.session_state.chat_history[chat_id]["messages"].copy()
+    elif index.titles.get(chat_id) == "New Chat":
+        title = make_title(messages)
+        store.set_title(user_id, chat_id, title)
+        index.set_title(chat_id, title)
+
+    store.append_messages(user_id, chat_id, messages, st.session_state.saved_count)
+    st.session_state.saved_count = len(messages)
+
+def load_chat(chat_id):
+    """Loads a chat's messages from the store"""
+    save_current_chat()
+    st.session_state.messages = _chat_store().load_messages(_user_id(), chat_id)
+    st.session_state.current_chat_id = chat_id
+    st.session_state.saved_count = len(st.session_state.messages)
+
+def delete_chat(chat_id):
+    """Deletes a chat; deleting the open chat starts a new one"""
+    _chat_store().delete_chat(_user_id(), chat_id)
+    _chat_index().remove(chat_id)
+    if st.session_state.current_chat_id == chat_id:
+        st.session_state.current_chat_id = None
+        st.session_state.messages = []
+        st.session_state.saved_count = 0
+
+# --- File Upload Scoring ---
+def upload_panel():
+    """Starts a background scoring job for an uploaded CSV/TXT file"""
+    uploaded = st.file_uploader("One review per line (.txt) or a CSV column", type=["csv", "txt"], key="upload_file")
+    job = st.session_state.get("upload_job")
+    running = job is not None and not job.done
+
+    if uploaded is not None:
+        data = uploaded.getvalue()
+        text_field = None
+        if uploaded.name.lower().endswith(".csv"):
+            columns = csv_columns(data)
+            default = columns.index("cleaned_review") if "cleaned_review" in columns else 0
+            text_field = st.selectbox("Text column", columns, index=default, key="upload_column")
+        if st.button("Start scoring", disabled=running, key="upload_start_btn"):
+            texts = read_texts(data, uploaded.name, text_field)
+            if job is not None:
+                job.discard()
+            st.session_state.upload_job = start_upload_job(texts)  # leases the serving model
+            st.session_state.upload_job_name = os.path.splitext(uploaded.name)[0]
+            running = True
+
+    if st.session_state.get("upload_job") is not None:
+        # Only this fragment re-runs while the job is going; the rest of the page stays idle
+        st.fragment(upload_progress, run_every=1.0 if running else None)()
+
+def upload_progress():
+    """Progress bar, partial statistics and, once finished, the download"""
+    job = st.session_state.upload_job
+    p = job.progress()
+    st.progress(p["fraction"], text=f"{p['rows_done']:,} / {p['total']:,} rows · {p['rows_per_s']:,.0f} rows/s")
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Positive", f"{p['labels']['Positive']:,}")
+    c2.metric("Negative", f"{p['labels']['Negative']:,}")
+    c3.metric("Empty", f"{p['labels']['Neutral']:,}")
+    c4.metric("Mean confidence", f"{p['mean_confidence']*100:.1f}%")
+
+    if p["error"]:
+        st.error(f"Scoring failed: {p['error']}")
+    if not p["done"]:
+        if st.button("Cancel", key="upload_cancel_btn"):
+            job.cancel()
+        return
+
+    if st.session_state.get("upload_job_shown") is not job:
+        # Finished since the last full run: re-run the page once to stop polling
+        st.session_state.upload_job_shown = job
+        st.rerun()
+    with open(job.output_path, "rb") as f:
+        st.download_button(
+            f"Download {p['rows_done']:,} scored rows", f,
+            file_name=f"{st.session_state.get('upload_job_name', 'reviews')}_scored.csv",
+            mime="text/csv", key="upload_download_btn",
+        )
 
 # --- Page Logic ---
 def chat_page():
@@ -50,7 +144,7 @@ def chat_page():
     # Initialize backend
     @st.cache_resource
     def load_stable_model():
-        return backend.initialize_backend()
+        return backend.get_backend()
 
     # Load with visual feedback
     placeholder = st.empty()
@@ -60,13 +154,13 @@ def chat_page():
             with st.spinner("Loading Stable Sentiment Model..."):
                 model, vectorizer = load_stable_model()
         placeholder.empty() # Clear loading message on success
+        startup_profile.report()
     except Exception as e:
         st.error(f"Failed to load backend: {e}")
         st.stop()
     
-    # Initialize first chat if needed
-    if st.session_state.current_chat_id is None:
-        create_new_chat()
+    if "chat_list_limit" not in st.session_state:
+        st.session_state.chat_list_limit = CHATS_PER_PAGE
 
 
     # Sidebar Tools (ChatGPT-style layout)
@@ -89,49 +183,41 @@ def chat_page():
         )
         st.session_state.chat_search_query = search_query
         
+        # Document mode: one label per sentence plus an overall label
+        document_mode = st.toggle("📄 Document mode", key="document_mode",
+                                  help="Split the message into sentences (۔ ؟ or new line) and score each one")
+        
         st.markdown("---")
         
         # 3. Chat History Section
         st.markdown("**Your chats**")
         
-        # Display saved chats
-        if st.session_state.chat_history:
-            # Sort chats by ID (most recent first)
-            sorted_chats = sorted(
-                st.session_state.chat_history.items(), 
-                key=lambda x: int(x[0].split('_')[1]), 
-                reverse=True
-            )
+        # Display saved chats (one page at a time, newest first)
+        index = _chat_index()
+        if len(index):
+            limit = st.session_state.chat_list_limit
+            page = index.page(limit + 1, query=search_query)
             
-            # Filter chats based on search query
-            if search_query:
-                filtered_chats = [
-                    (chat_id, chat_data) for chat_id, chat_data in sorted_chats
-                    if search_query.lower() in chat_data['title'].lower()
-                ]
-            else:
-                filtered_chats = sorted_chats
-            
-            if filtered_chats:
-                for chat_id, chat_data in filtered_chats:
+            if page:
+                for chat_id, title in page[:limit]:
                     col1, col2 = st.columns([5, 1])
                     
                     with col1:
                         # Create a button for each chat
-                        is_current = chat_id == st.session_state.current_chat_id
-                        button_label = chat_data['title']
-                        
-                        if st.button(button_label, key=f"load_{chat_id}", use_container_width=True):
+                        if st.button(title, key=f"load_{chat_id}", use_container_width=True):
                             load_chat(chat_id)
                             st.rerun()
                     
                     with col2:
                         # Delete button
                         if st.button("🗑️", key=f"del_{chat_id}"):
-                            del st.session_state.chat_history[chat_id]
-                            if st.session_state.current_chat_id == chat_id:
-                                create_new_chat()
+                            delete_chat(chat_id)
                             st.rerun()
+                
+                if len(page) > limit:
+                    if st.button("Show more", use_container_width=True, key="more_chats_btn"):
+                        st.session_state.chat_list_limit += CHATS_PER_PAGE
+                        st.rerun()
             else:
                 st.caption(f"No chats found matching '{search_query}'")
         else:
@@ -189,6 +275,10 @@ def chat_page():
             with st.chat_message("assistant", avatar=avatar):
                 st.markdown(content)
 
+    # File upload (scored in the background)
+    with st.expander("📎 Score a file (CSV / TXT)"):
+        upload_panel()
+
     # Chat Input
     if prompt := st.chat_input("Send a message..."):
         # Add user message
@@ -201,8 +291,13 @@ def chat_page():
             message_placeholder = st.empty()
             
             # 1. Processing State
-            with st.spinner("Thinking..."):
-                label, conf = backend.predict_sentiment(prompt, model, vectorizer)
+            # Leased per message: a model registry hot-swap never changes the model mid-prediction
+            with st.spinner("Thinking..."), backend.serving_model() as (model, vectorizer):
+                if document_mode:
+                    doc = backend.predict_document(prompt, model, vectorizer, log=True)
+                    label, conf = doc["label"], doc["confidence"]
+                else:
+                    label, conf = backend.predict_sentiment(prompt, model, vectorizer)
             
             # 2. Construct Response
             if label == "Positive":
@@ -212,7 +307,24 @@ def chat_page():
                 sentiment_emoji = "😠"
                 color = "red"
                 
-            response_md = f"""
+            if document_mode:
+                sentence_rows = "\n".join(
+                    f"| {i} | {s['text'].replace('|', '&#124;')} | {s['label']} | {s['confidence']*100:.1f}% |"
+                    for i, s in enumerate(doc["sentences"], 1)
+                )
+                response_md = f"""
+**Document Sentiment Analysis**
+
+- **Sentences**: {len(doc["sentences"])}
+- **Overall sentiment**: <span style='color:{color}; font-weight:bold'>{label} {sentiment_emoji}</span>
+- **Confidence**: `{conf*100:.1f}%` (weighted by sentence length)
+
+| # | Sentence | Sentiment | Confidence |
+|---|---|---|---|
+{sentence_rows}
+                """
+            else:
+                response_md = f"""
 **Sentiment Analysis Result**
 
 - **Input**: *"{prompt}"*
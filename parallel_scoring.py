@@ -0,0 +1,176 @@
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import backend
+
+SHARDS_PER_WORKER = 4
+MAX_RETRIES = 2
+# Result for every text of a shard that kept crashing its worker
+ERROR_RESULT = ("Error", 0.0)
+
+# Set in the parent before the pool forks, so workers inherit them copy-on-write
+_worker_backend = None
+_started = None  # shard ids as workers pick them up, to tell which shards a crash took down
+
+
+def _init_worker(started):
+    # spawn/forkserver platforms: each worker maps the same artifact files
+    global _worker_backend, _started
+    _worker_backend = _load_backend()
+    _started = started
+
+
+def _load_backend():
+    # A batch job scores with one version, and the registry's watcher thread
+    # must not be running when the pool forks
+    if backend.SENTIMENT_MODEL == "registry":
+        from model_registry import load_current
+        return load_current()
+    return backend.get_backend()
+
+
+def _score_shard(shard_id, texts):
+    _started.put(shard_id)
+    model, vectorizer = _worker_backend
+    return backend.predict_sentiment_batch(texts, model, vectorizer, use_cache=False)
+
+
+def make_shards(texts, n_shards):
+    """
+    Splits texts into up to n_shards contiguous (start, end) ranges holding
+    roughly equal amounts of text, since cost grows with length, not count.
+    """
+    if not texts:
+        return []
+    n_shards = max(1, min(n_shards, len(texts)))
+    cumulative = np.cumsum([len(t) if isinstance(t, str) else 1 for t in texts])
+    targets = cumulative[-1] * np.arange(1, n_shards) / n_shards
+    cuts = np.unique(np.searchsorted(cumulative, targets, side="right"))
+    bounds = [0] + [int(c) for c in cuts if 0 < c < len(texts)] + [len(texts)]
+    return [(s, e) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+
+class ScoringPool:
+    """
+    Process-pool scorer for large jobs.
+    The model is loaded once in the parent and shared with the workers
+    (fork copy-on-write, or the memory-mapped artifact elsewhere). The
+    workers are started when the pool is created and live until close(),
+    so create the pool before anything starts threads (the prediction
+    logger, a model registry). Input is cut into length-balanced shards
+    and results come back in input order.
+    If a worker dies, the pool is rebuilt and the shards it took down are
+    re-run one at a time to find the one that crashed; only that shard is
+    charged a retry, and one that keeps crashing gets ERROR_RESULT for all
+    of its texts. Scoring it here would take the whole job down with it.
+    Rebuilt pools use forkserver (or spawn): by then the caller may have
+    threads running, and forking would copy them mid-flight.
+    """
+
+    def __init__(self, workers=None, shards_per_worker=SHARDS_PER_WORKER, max_retries=MAX_RETRIES):
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.max_retries = max_retries
+        self.model, self.vectorizer = _load_backend()
+        methods = mp.get_all_start_methods()
+        self._fork = "fork" in methods
+        self._rebuild_context = mp.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._context = mp.get_context("fork") if self._fork else self._rebuild_context
+        self._started = self._context.SimpleQueue()
+        self._pool = None
+        self._get_pool()
+
+    def _get_pool(self):
+        global _worker_backend, _started
+        if self._pool is None:
+            if self._fork:
+                _worker_backend, _started = (self.model, self.vectorizer), self._started
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=self._context)
+                # Only the first pool is forked, before the caller starts any threads
+                self._fork = False
+                self._context = self._rebuild_context
+            else:
+                self._started = self._context.SimpleQueue()
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=self._context,
+                                                 initializer=_init_worker, initargs=(self._started,))
+            # With fork, the first submit starts every worker at once
+            self._pool.submit(int).result()
+        return self._pool
+
+    def _reset_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _drain_started(self):
+        started = set()
+        while not self._started.empty():
+            started.add(self._started.get())
+        return started
+
+    def score(self, texts):
+        """Returns [(label, confidence), ...] for texts, in order."""
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = dict(enumerate(make_shards(texts, self.workers * self.shards_per_worker)))
+        attempts = {i: 0 for i in pending}
+        suspects = set()
+        self._drain_started()
+
+        while pending:
+            pool = self._get_pool()
+            # Suspects run alone, so a crash can be pinned on one shard
+            batch = [min(suspects)] if suspects else list(pending)
+            futures = {pool.submit(_score_shard, i, texts[pending[i][0]:pending[i][1]]): i for i in batch}
+            broken = False
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    shard_results = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    continue
+                s, e = pending.pop(i)
+                results[s:e] = shard_results
+                suspects.discard(i)
+
+            if not broken:
+                continue
+
+            self._reset_pool()
+            if len(batch) > 1:
+                suspects = (self._drain_started() & set(pending)) or set(pending)
+                print(f"Warning: a scoring worker died; re-running {len(suspects)} shard(s) one at a time.")
+                continue
+
+            i = batch[0]
+            attempts[i] += 1
+            print(f"Warning: shard {i} crashed a scoring worker (attempt {attempts[i]}).")
+            if attempts[i] > self.max_retries:
+                s, e = pending.pop(i)
+                suspects.discard(i)
+                print(f"Warning: giving up on shard {i}; rows {s}-{e - 1} are marked {ERROR_RESULT[0]}.")
+                results[s:e] = [ERROR_RESULT] * (e - s)
+
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_parallel(texts, workers=None):
+    """One-shot helper: scores texts on a temporary process pool."""
+    with ScoringPool(workers) as pool:
+        return pool.score(texts)
@@ -0,0 +1,81 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache settings (override through the environment / .env)
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "50000"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "3600"))  # seconds, 0 disables expiry
+CACHE_LOG_HITS = os.getenv("CACHE_LOG_HITS", "true").lower() in ("1", "true", "yes")
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of (label, confidence) keyed on (model version,
+    cleaned text), so a model change can never serve stale predictions.
+    Entries of a version that is no longer used simply age out through the
+    LRU; switching back and forth (e.g. a registry rollback or two sessions
+    on different models) keeps both warm. Entries older than ttl seconds
+    are treated as misses.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get_many(self, keys, version):
+        """Returns a list with the cached value or None for every key."""
+        now = time.monotonic()
+        out = []
+        with self._lock:
+            for key in keys:
+                key = (version, key)
+                entry = self._data.get(key)
+                if entry is None:
+                    self.stats["misses"] += 1
+                    out.append(None)
+                    continue
+                value, stored_at = entry
+                if self.ttl and now - stored_at > self.ttl:
+                    del self._data[key]
+                    self.stats["expirations"] += 1
+                    self.stats["misses"] += 1
+                    out.append(None)
+                    continue
+                self._data.move_to_end(key)
+                self.stats["hits"] += 1
+                out.append(value)
+        return out
+
+    def put_many(self, items, version):
+        """Stores (key, value) pairs, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items:
+                key = (version, key)
+                self._data[key] = (value, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        with self._lock:
+            versions = sorted({version for version, _ in self._data}, key=str)
+            return dict(self.stats, size=len(self._data), max_size=self.max_size, versions=versions)
+
+
+prediction_cache = PredictionCache()
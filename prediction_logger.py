@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# Flush settings (override through the environment / .env)
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "50000"))
+LOG_SPOOL_PATH = os.getenv("LOG_SPOOL_PATH", "sentiment_logs.spool.jsonl")
+LOG_REPLAY_INTERVAL = float(os.getenv("LOG_REPLAY_INTERVAL", "30.0"))
+
+
+def _default_insert(rows):
+    # Supabase or embedded SQLite, depending on LOG_STORE
+    from log_store import get_log_store
+    get_log_store().insert_many(rows)
+
+
+class PredictionLogger:
+    """
+    Background writer for sentiment_logs (through the configured LogStore).
+    Records are queued by the caller and flushed by a daemon thread as
+    multi-row inserts when batch_size records are waiting or every
+    flush_interval seconds. The queue is bounded: when it is full new
+    records are dropped and counted instead of blocking the prediction.
+    Failed inserts are appended to a local JSONL spool and replayed later.
+    """
+
+    def __init__(
+        self,
+        insert_fn=None,
+        batch_size=LOG_BATCH_SIZE,
+        flush_interval=LOG_FLUSH_INTERVAL,
+        max_queue=LOG_QUEUE_SIZE,
+        spool_path=LOG_SPOOL_PATH,
+        replay_interval=LOG_REPLAY_INTERVAL,
+    ):
+        self.insert_fn = insert_fn or _default_insert
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.replay_interval = replay_interval
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "spooled": 0, "replayed": 0, "failures": 0}
+
+        self._spool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_replay = 0.0
+        self._thread = threading.Thread(target=self._run, name="prediction-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, review, prediction, confidence, model_version):
+        """Queues one record. Never blocks; returns False if it was dropped."""
+        return self.log_many([(review, prediction, confidence)], model_version) == 1
+
+    def log_many(self, items, model_version):
+        """
+        Queues (review, prediction, confidence) tuples. Returns how many were accepted.
+        Records carry no created_at: the store stamps it when the row is
+        written, so readers paging by (created_at, id) never find a row
+        appearing behind their cursor after a delayed flush or a spool replay.
+        """
+        accepted = 0
+        for review, prediction, confidence in items:
+            record = {
+                "review": review,
+                "prediction": prediction,
+                "confidence": float(confidence),
+                "model_version": model_version,
+            }
+            try:
+                self.queue.put_nowait(record)
+                accepted += 1
+            except queue.Full:
+                self.stats["dropped"] += 1
+                metrics.log_dropped_total.inc()
+        self.stats["enqueued"] += accepted
+        return accepted
+
+    def write_many(self, items, model_version):
+        """
+        Writes (review, prediction, confidence) tuples right away as one bulk
+        insert, on the caller's thread. For background jobs that produce
+        whole chunks of results; a failed write is spooled like any other.
+        """
+        records = [
+            {
+                "review": review,
+                "prediction": prediction,
+                "confidence": float(confidence),
+                "model_version": model_version,
+            }
+            for review, prediction, confidence in items
+        ]
+        if records:
+            self._flush(records)
+        return len(records)
+
+    def close(self, timeout=10.0):
+        """Stops the writer thread after draining whatever is still queued."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # --- Writer thread ---
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            self._maybe_replay()
+
+        # Shutdown: drain everything that is left
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._flush(batch)
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            self.insert_fn(batch)
+            metrics.stage_latency.observe(time.perf_counter() - start, "logging")
+            self.stats["written"] += len(batch)
+        except Exception as e:
+            self.stats["failures"] += 1
+            metrics.log_failures_total.inc()
+            print(f"Warning: Failed to write {len(batch)} prediction logs, spooling locally: {e}")
+            self._spool(batch)
+
+    def _spool(self, rows):
+        with self._spool_lock:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stats["spooled"] += len(rows)
+
+    def _maybe_replay(self):
+        now = time.monotonic()
+        if now - self._last_replay < self.replay_interval:
+            return
+        self._last_replay = now
+        self.replay()
+
+    def replay(self):
+        """Re-sends spooled records. Records that fail again stay in the spool."""
+        replay_path = self.spool_path + ".replay"
+        with self._spool_lock:
+            # A leftover replay file means an earlier replay was interrupted; finish it first
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spool_path) or os.path.getsize(self.spool_path) == 0:
+                    return 0
+                os.replace(self.spool_path, replay_path)
+
+        with open(replay_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+        sent = 0
+        try:
+            for i in range(0, len(rows), self.batch_size):
+                self.insert_fn(rows[i:i + self.batch_size])
+                sent = i + len(rows[i:i + self.batch_size])
+        except Exception as e:
+            print(f"Warning: Spool replay stopped after {sent} records: {e}")
+            self._spool(rows[sent:])
+            self.stats["spooled"] -= len(rows) - sent
+
+        os.remove(replay_path)
+        self.stats["replayed"] += sent
+        return sent
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_logger():
+    """Returns the process-wide PredictionLogger, starting it on first use."""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = PredictionLogger()
+    return _logger
@@ -0,0 +1,160 @@
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+
+import backend
+from prediction_logger import get_logger
+
+CHUNK_SIZE = 5000
+OUTPUT_FIELDS = ["row", "label", "confidence", "id"]
+
+
+def iter_texts(path, text_field, fmt):
+    """Yields (row_number, text, passthrough_id) one record at a time."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "jsonl":
+            for row, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield row, record.get(text_field, ""), record.get("id")
+        else:
+            for row, record in enumerate(csv.DictReader(f)):
+                yield row, record.get(text_field, ""), record.get("id")
+
+
+def available_fields(path, fmt):
+    """Field names of the CSV header or the first JSONL record; None for an empty file."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    return list(json.loads(line))
+            return None
+        return csv.DictReader(f).fieldnames
+
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"rows_done": 0, "output_offset": 0}
+
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def score_file(input_path, output_path, text_field=None, fmt=None, chunk_size=CHUNK_SIZE,
+               log=False, use_cache=False, resume=True, workers=1):
+    """
+    Scores a CSV/JSONL file chunk by chunk with one vectorized call per chunk.
+    Results are appended to a CSV as they are produced and a checkpoint is
+    written after every chunk, so an interrupted run picks up where it stopped.
+    With log=True each chunk is written to the log store before its checkpoint.
+    """
+    fmt = fmt or ("jsonl" if input_path.endswith((".jsonl", ".json")) else "csv")
+    text_field = text_field or ("cleaned_review" if fmt == "csv" else "text")
+    checkpoint_path = output_path + ".ckpt"
+
+    # A missing field would otherwise score every record as empty text
+    fields = available_fields(input_path, fmt)
+    if fields is not None and text_field not in fields:
+        raise ValueError(f"No '{text_field}' field in {input_path}; available: {', '.join(map(str, fields))}. "
+                         f"Pick one with --text-field.")
+
+    state = load_checkpoint(checkpoint_path) if resume else {"rows_done": 0, "output_offset": 0}
+    if state["rows_done"] and os.path.exists(output_path):
+        print(f"Resuming after {state['rows_done']} rows.")
+        out = open(output_path, "r+", encoding="utf-8", newline="")
+        # Drop anything written after the last checkpoint
+        out.truncate(state["output_offset"])
+        out.seek(state["output_offset"])
+        writer = csv.writer(out)
+    else:
+        state = {"rows_done": 0, "output_offset": 0}
+        out = open(output_path, "w", encoding="utf-8", newline="")
+        writer = csv.writer(out)
+        writer.writerow(OUTPUT_FIELDS)
+
+    pool = None
+    if workers > 1:
+        # Forks its workers right away, before the logger thread starts
+        from parallel_scoring import ScoringPool
+        pool = ScoringPool(workers)
+        model, vectorizer = pool.model, pool.vectorizer
+    else:
+        model, vectorizer = backend.get_backend()
+    records = islice(iter_texts(input_path, text_field, fmt), state["rows_done"], None)
+    start = time.perf_counter()
+    scored = 0
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            texts = [text for _, text, _ in chunk]
+            if pool:
+                results = pool.score(texts)
+            else:
+                results = backend.predict_sentiment_batch(texts, model, vectorizer, use_cache=use_cache)
+            if log:
+                # One synchronous bulk insert per chunk (spooled on failure), never the
+                # bounded queue, which drops records under backpressure and is abandoned at exit.
+                # Neutral (empty) and Error (crashed shard, see parallel_scoring) rows are not predictions.
+                get_logger().write_many(
+                    [(t, l, c) for t, (l, c) in zip(texts, results) if l in ("Positive", "Negative")],
+                    backend.model_version_of(model),
+                )
+            writer.writerows(
+                [row, label, f"{conf:.6f}", rec_id if rec_id is not None else ""]
+                for (row, _, rec_id), (label, conf) in zip(chunk, results)
+            )
+            out.flush()
+            os.fsync(out.fileno())
+
+            scored += len(chunk)
+            state["rows_done"] += len(chunk)
+            state["output_offset"] = out.tell()
+            save_checkpoint(checkpoint_path, state)
+
+            rate = scored / max(time.perf_counter() - start, 1e-9)
+            print(f"  {state['rows_done']} rows scored ({rate:,.0f} rows/s)")
+    finally:
+        out.close()
+        if pool:
+            pool.close()
+
+    # Finished cleanly: the checkpoint is no longer needed
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"Done. {state['rows_done']} rows written to {output_path}")
+    return state["rows_done"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream-score a CSV or JSONL file with the sentiment model.")
+    parser.add_argument("input")
+    parser.add_argument("output", help="CSV file with row,label,confidence,id")
+    parser.add_argument("--text-field", help="column/key holding the text (default: cleaned_review for CSV, text for JSONL)")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--log", action="store_true", help="also send results to sentiment_logs")
+    parser.add_argument("--cache", action="store_true", help="use the in-process prediction cache")
+    parser.add_argument("--workers", type=int, default=1, help="score each chunk on a process pool (use large chunks)")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    args = parser.parse_args()
+
+    try:
+        score_file(args.input, args.output, args.text_field, args.format, args.chunk_size,
+                   log=args.log, use_cache=args.cache, resume=not args.restart, workers=args.workers)
+    except Exception as e:
+        print(f"Scoring failed: {e}")
+        sys.exit(1)
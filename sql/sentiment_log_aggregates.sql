@@ -0,0 +1,44 @@
+-- Server-side aggregates for the admin dashboard (run once in the Supabase SQL editor).
+-- The dashboard calls these through supabase.rpc(...) instead of downloading rows.
+
+-- created_at is stamped by the database when a row is written; the app never sends it
+alter table sentiment_logs alter column created_at set default now();
+
+-- Keyset pagination and time-range filters both walk this index
+create index if not exists sentiment_logs_created_at_id_idx
+    on sentiment_logs (created_at, id);
+
+-- Row counts per (prediction, model_version)
+create or replace function sentiment_log_counts(since timestamptz default null)
+returns table (prediction text, model_version text, n bigint)
+language sql stable
+as $$
+    select prediction, model_version, count(*)
+    from sentiment_logs
+    where since is null or created_at >= since
+    group by prediction, model_version
+$$;
+
+-- Row counts per time bucket ('minute', 'hour', 'day', 'week', 'month') and prediction
+create or replace function sentiment_log_buckets(bucket text default 'hour', since timestamptz default null)
+returns table (bucket_start timestamptz, prediction text, n bigint)
+language sql stable
+as $$
+    select date_trunc(bucket, created_at), prediction, count(*)
+    from sentiment_logs
+    where since is null or created_at >= since
+    group by 1, 2
+    order by 1
+$$;
+
+-- Confidence histogram: bins of equal width over [0, 1], numbered 1..bins
+create or replace function sentiment_log_confidence_histogram(bins int default 10, since timestamptz default null)
+returns table (bin int, prediction text, n bigint)
+language sql stable
+as $$
+    select least(greatest(width_bucket(confidence, 0, 1, bins), 1), bins), prediction, count(*)
+    from sentiment_logs
+    where since is null or created_at >= since
+    group by 1, 2
+    order by 1
+$$;
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import importlib
+from contextlib import contextmanager
+
+# Set STARTUP_PROFILE=1 to record how long imports and lazy resources take
+ENABLED = os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+
+# App modules in the order a cold start touches them
+APP_MODULES = ["urdu_text", "prediction_cache", "prediction_logger", "linear_artifact", "db", "auth", "backend", "api"]
+
+_timings = []  # (kind, name, seconds)
+_reported = False
+
+
+def record(kind, name, seconds):
+    if ENABLED:
+        _timings.append((kind, name, seconds))
+
+
+@contextmanager
+def timed(name, kind="resource"):
+    """Times the block when profiling is enabled; free otherwise."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((kind, name, time.perf_counter() - start))
+
+
+def timings():
+    return [{"kind": k, "name": n, "ms": round(s * 1000, 2)} for k, n, s in _timings]
+
+
+def report(once=True):
+    """Prints the recorded timings (only when profiling is enabled)."""
+    global _reported
+    if not ENABLED or (once and _reported):
+        return
+    _reported = True
+    print("--- Startup profile ---")
+    for kind, name, seconds in _timings:
+        print(f"{kind:<9} {name:<40} {seconds * 1000:9.1f} ms")
+    print(f"{'total':<50} {sum(s for _, _, s in _timings) * 1000:9.1f} ms")
+
+
+def profile_cold_start(modules=APP_MODULES, sample_text="بہت اچھا"):
+    """
+    Imports each app module in turn, then builds every lazy resource once.
+    Import times are cumulative: a module is charged for whatever it pulls in
+    that was not already loaded.
+    """
+    global ENABLED
+    ENABLED = True
+
+    for name in modules:
+        if name in sys.modules:
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Warning: could not import {name}: {e}")
+            continue
+        record("import", name, time.perf_counter() - start)
+
+    import db
+    import backend
+    db.get_public_client()
+    db.get_admin_client()
+    model, vectorizer = backend.get_backend()
+    with timed("first prediction"):
+        backend.predict_sentiment_batch([sample_text], model, vectorizer, use_cache=False)
+    return timings()
+
+
+if __name__ == "__main__":
+    # python startup_profile.py [--json]
+    # Go through the importable module so app code and this script share one recorder
+    import startup_profile as profiler
+    try:
+        result = profiler.profile_cold_start()
+    except Exception as e:
+        print(f"Error: {e}")
+        result = profiler.timings()
+    if "--json" in sys.argv:
+        print(json.dumps(result, indent=2))
+    else:
+        profiler.report()
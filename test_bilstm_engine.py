@@ -0,0 +1,80 @@
+import pickle
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from bilstm_engine import MAX_LEN, BucketedBiLSTM, export_tflite, load_bilstm
+
+TEXTS = ["یہ فلم بہت اچھی ہے", "یہ بہت بیکار ہے", "کھانا مزیدار تھا سروس بہت اچھی تھی", "اچھا"]
+
+
+def _train_tiny(tmp_path):
+    # Same layer stack as train_bilstm.train_model, just narrower
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Embedding, LSTM, Bidirectional, Dense, Dropout
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
+    tokenizer = Tokenizer(num_words=100, oov_token="<OOV>")
+    tokenizer.fit_on_texts(TEXTS)
+    model = Sequential([
+        Embedding(input_dim=100, output_dim=8),
+        Bidirectional(LSTM(8, return_sequences=True)),
+        Bidirectional(LSTM(4)),
+        Dropout(0.4),
+        Dense(4, activation="relu"),
+        Dense(1, activation="sigmoid"),
+    ])
+    model.build((None, MAX_LEN))
+    model.compile(loss="binary_crossentropy", optimizer="adam")
+    rng = np.random.default_rng(0)
+    model.fit(rng.integers(0, 100, (32, MAX_LEN)), rng.integers(0, 2, 32), epochs=1, verbose=0)
+
+    keras_path, tokenizer_path = str(tmp_path / "model.h5"), str(tmp_path / "tokenizer.pkl")
+    model.save(keras_path)
+    with open(tokenizer_path, "wb") as f:
+        pickle.dump(tokenizer, f)
+    return model, tokenizer, keras_path, tokenizer_path
+
+
+def test_export_round_trip_matches_keras(tmp_path):
+    keras_model, keras_tokenizer, keras_path, tokenizer_path = _train_tiny(tmp_path)
+    out_dir = str(tmp_path / "tflite")
+    export_tflite(keras_path, tokenizer_path, out_dir, batch_sizes=(1, 8), buckets=(8, MAX_LEN))
+    model, tokenizer = load_bilstm(out_dir)
+    # What the registry runs before a swap: every graph built, nothing counted as traffic
+    model.warm()
+    assert set(model._interpreters) == set(model.graphs) and not any(model.bucket_counts.values())
+
+    sequences = tokenizer.transform(TEXTS * 3)
+    assert sequences == keras_tokenizer.texts_to_sequences(TEXTS * 3)
+
+    # Padded to MAX_LEN: same input as Keras sees
+    full = BucketedBiLSTM(model.graphs, buckets=(MAX_LEN,)).predict_proba(sequences)[:, 1]
+    expected = keras_model.predict(model.pad(sequences, MAX_LEN), verbose=0).reshape(-1)
+    np.testing.assert_allclose(full, expected, atol=1e-5)
+
+    # Bucketed: each row scored as Keras scores it padded to its bucket
+    bucketed = model.predict_proba(sequences)[:, 1]
+    expected = [
+        keras_model.predict(model.pad([seq], model._bucket_for(len(seq))), verbose=0)[0, 0] for seq in sequences
+    ]
+    np.testing.assert_allclose(bucketed, expected, atol=1e-5)
+
+
+def test_concurrent_callers_get_their_own_scores(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    _, _, keras_path, tokenizer_path = _train_tiny(tmp_path)
+    out_dir = str(tmp_path / "tflite")
+    export_tflite(keras_path, tokenizer_path, out_dir, batch_sizes=(1, 8), buckets=(8, MAX_LEN))
+    model, tokenizer = load_bilstm(out_dir)
+
+    requests = [tokenizer.transform([TEXTS[i % len(TEXTS)]] * (1 + i % 5)) for i in range(200)]
+    expected = [model.predict_proba(seqs) for seqs in requests]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(model.predict_proba, requests))
+    for got, want in zip(results, expected):
+        np.testing.assert_array_equal(got, want)
+    assert sum(model.bucket_counts.values()) == 2 * sum(len(r) for r in requests)
@@ -0,0 +1,66 @@
+import random
+
+from chat_store import ChatIndex, ChatStore, make_title
+
+
+def _naive_search(titles, query):
+    return sorted((i for i, t in titles.items() if query.lower() in t.lower()), reverse=True)
+
+
+def test_index_search_matches_scan():
+    rng = random.Random(3)
+    words = ["فلم", "اچھی", "بری", "movie", "Great", "کھانا", "سروس", "ok"]
+    index, titles = ChatIndex(), {}
+    for chat_id in range(1, 400):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        index.add(chat_id, title)
+        titles[chat_id] = title
+        if rng.random() < 0.2:
+            victim = rng.choice(list(titles))
+            index.remove(victim)
+            del titles[victim]
+        if rng.random() < 0.1:
+            renamed = rng.choice(list(titles))
+            titles[renamed] = rng.choice(words)
+            index.set_title(renamed, titles[renamed])
+
+    for query in words + ["", "a", "فل", "فلم اچ", "great m", "zzz"]:
+        assert index.search(query) == _naive_search(titles, query), query
+
+
+def test_index_pages_newest_first():
+    index = ChatIndex((i, f"chat {i}") for i in range(1, 46))
+    first = index.page(20)
+    assert [i for i, _ in first] == list(range(45, 25, -1))
+    assert [i for i, _ in index.page(20, offset=40)] == [5, 4, 3, 2, 1]
+    assert [i for i, _ in index.page(3, query="chat 4")] == [45, 44, 43]
+
+
+def test_store_round_trip(tmp_path):
+    store = ChatStore(str(tmp_path / "chats.db"))
+    messages = [{"role": "user", "content": "یہ فلم بہت اچھی ہے اور اس کی کہانی بھی"},
+                {"role": "assistant", "content": "Positive"}]
+    chat_id = store.create_chat("u1", make_title(messages))
+    store.append_messages("u1", chat_id, messages[:1], 0)
+    store.append_messages("u1", chat_id, messages, 1)
+    other = store.create_chat("u2")
+
+    assert store.load_messages("u1", chat_id) == messages
+    assert store.index("u1").page(10) == [(chat_id, make_title(messages))]
+    assert store.index("u2").page(10) == [(other, "New Chat")]
+
+    store.delete_chat("u1", chat_id)
+    assert len(store.index("u1")) == 0
+    assert store.load_messages("u1", chat_id) == []
+
+
+def test_deleted_chat_ids_are_not_reused(tmp_path):
+    path = str(tmp_path / "chats.db")
+    store = ChatStore(path)
+    first = store.create_chat("u1")
+    second = store.create_chat("u1")
+    store.delete_chat("u1", second)
+    third = store.create_chat("u1")
+    assert third > second > first
+    # The sequence survives a restart
+    assert ChatStore(path).create_chat("u1") == third + 1
@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+
+from linear_artifact import export_linear_model, load_linear_model
+
+WORDS = ["بہت", "اچھا", "برا", "فلم", "ہے", "یہ", "بالکل", "فضول", "زبردست", "شاندار", "نہیں", "پسند"]
+
+
+def _corpus(n=400, seed=1):
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+    labels = [int("اچھا" in t or "زبردست" in t) for t in texts]
+    return texts, labels
+
+
+def _check(model, vectorizer, tmp_path):
+    texts, labels = _corpus()
+    X = vectorizer.fit_transform(texts)
+    model.fit(X, labels)
+
+    export_linear_model(model, vectorizer, str(tmp_path))
+    mapped_model, mapped_vectorizer = load_linear_model(str(tmp_path))
+
+    probe = texts[:100] + ["", "نیا لفظ", "بہت بہت اچھا اچھا"]
+    expected = model.predict_proba(vectorizer.transform(probe))
+    actual = mapped_model.predict_proba(mapped_vectorizer.transform(probe))
+    assert np.allclose(expected, actual, rtol=0, atol=1e-12)
+    assert list(mapped_model.classes_) == list(model.classes_)
+
+
+def test_logistic_regression_matches_sklearn(tmp_path):
+    _check(LogisticRegression(), TfidfVectorizer(max_features=5000), tmp_path)
+
+
+def test_calibrated_svm_with_ngrams_matches_sklearn(tmp_path):
+    _check(
+        CalibratedClassifierCV(LinearSVC(), cv=3),
+        TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+        tmp_path,
+    )
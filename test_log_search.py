@@ -0,0 +1,136 @@
+import pytest
+
+import log_store
+from log_store import SQLiteLogStore, search_match_expression
+from log_cache import LocalLogCache
+
+ROWS = [
+    {"created_at": "2026-01-01T10:00:00+00:00", "review": "یہ فلم بہت اچھی ہے!", "prediction": "Positive",
+     "confidence": 0.9, "model_version": "v1"},
+    {"created_at": "2026-01-02T10:00:00+00:00", "review": "فلم بہت بری تھی، وقت ضائع", "prediction": "Negative",
+     "confidence": 0.8, "model_version": "v1"},
+    {"created_at": "2026-02-01T10:00:00+00:00", "review": "Great اچھا کھانا 10/10", "prediction": "Positive",
+     "confidence": 0.7, "model_version": "v2"},
+    {"created_at": "2026-02-03T10:00:00+00:00", "review": None, "prediction": "Negative",
+     "confidence": 0.6, "model_version": "v2"},
+]
+
+
+def _reviews(rows):
+    return [r["review"] for r in rows]
+
+
+def test_match_expression_is_cleaned_and_quoted():
+    assert search_match_expression('فلم "بہت اچھی" اچ*') == '"فلم" AND "بہت اچھی" AND "اچ" *'
+    assert search_match_expression('Great" OR NEAR(') is None
+    assert search_match_expression("") is None
+    assert search_match_expression("ا*") == '"ا"'
+    assert search_match_expression("ضائع۔ اچھا؟") == '"ضائع" AND "اچھا"'
+
+
+def test_words_next_to_urdu_punctuation_are_found(tmp_path):
+    store = SQLiteLogStore(str(tmp_path / "logs.db"))
+    review = "فلم بہت بری تھی، وقت ضائع۔ اچھا؟"
+    store.insert_many([dict(ROWS[0], review=review)])
+
+    for query in ["تھی", "ضائع", "اچھا", '"وقت ضائع"', '"تھی وقت"', "تھی،", "ضائ*"]:
+        assert _reviews(store.search(query)[0]) == [review], query
+
+
+def test_outdated_index_is_rebuilt(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "logs.db")
+    if not SQLiteLogStore(path).full_text_search:
+        pytest.skip("SQLite without FTS5")
+    SQLiteLogStore(path).insert_many([dict(ROWS[0], review="وقت ضائع۔")])
+    # An index written before punctuation became a word break
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "drop table review_index; pragma user_version = 1;"
+        "create virtual table review_index using fts5(review, tokenize = 'ascii', content = '');"
+        "insert into review_index (rowid, review) select rowid, review from sentiment_logs;"
+    )
+    conn.close()
+
+    assert _reviews(SQLiteLogStore(path).search("ضائع")[0]) == ["وقت ضائع۔"]
+
+
+def test_term_phrase_prefix_and_filters(tmp_path):
+    store = SQLiteLogStore(str(tmp_path / "logs.db"))
+    store.insert_many(ROWS)
+
+    assert _reviews(store.search("فلم")[0]) == [ROWS[1]["review"], ROWS[0]["review"]]
+    assert _reviews(store.search('"بہت اچھی"')[0]) == [ROWS[0]["review"]]
+    assert _reviews(store.search('"اچھی بہت"')[0]) == []
+    assert _reviews(store.search("اچھ*")[0]) == [ROWS[2]["review"], ROWS[0]["review"]]
+    assert _reviews(store.search("فلم", label="Negative")[0]) == [ROWS[1]["review"]]
+    assert _reviews(store.search("اچھ*", model_version="v2")[0]) == [ROWS[2]["review"]]
+    assert _reviews(store.search("", since="2026-01-02", until="2026-02-01")[0]) == [ROWS[1]["review"]]
+
+
+def test_search_without_fts5_scans_the_same_matches(tmp_path, monkeypatch):
+    with_index = SQLiteLogStore(str(tmp_path / "indexed.db"))
+    monkeypatch.setattr(log_store, "_fts5", False)
+    scan = SQLiteLogStore(str(tmp_path / "scan.db"))
+    assert not scan.full_text_search and scan.index_reviews() == 0
+
+    rows = ROWS + [dict(ROWS[0], review="فلم بہت بری تھی، وقت ضائع۔ اچھا؟"), dict(ROWS[0], review="100% اچھا_نہیں")]
+    for store in (with_index, scan):
+        store.insert_many(rows)
+    for query in ["فلم", '"بہت اچھی"', '"اچھی بہت"', "اچھ*", "ضائع", '"تھی وقت"', "تھی،", "%", "_", ""]:
+        assert _reviews(scan.search(query)[0]) == _reviews(with_index.search(query)[0]), query
+    assert _reviews(scan.search("فلم", label="Negative", limit=1)[0]) == [ROWS[1]["review"]]
+
+
+def test_pages_and_incremental_index(tmp_path):
+    store = SQLiteLogStore(str(tmp_path / "logs.db"))
+    store.insert_many(ROWS)
+    store.insert_many([dict(ROWS[0], review=f"فلم نمبر {i}") for i in range(5)])
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = store.search("فلم", limit=3, before=cursor)
+        seen += _reviews(rows)
+        if cursor is None:
+            break
+    assert len(seen) == 7 and len(set(seen)) == 7
+    assert seen[0] == "فلم نمبر 4"
+
+    # Reopening indexes nothing twice
+    assert SQLiteLogStore(str(tmp_path / "logs.db")).index_reviews() == 0
+
+
+def test_local_cache_is_searchable(tmp_path):
+    cache = LocalLogCache(str(tmp_path / "cache.db"))
+    cache.insert_many([dict(r, id=f"uuid-{i}") for i, r in enumerate(ROWS)])
+    rows, _ = cache.search("ضائع")
+    assert [r["id"] for r in rows] == ["uuid-1"]
+
+
+def test_rewound_cursor_rereads_late_rows(tmp_path):
+    from log_store import rewind_cursor
+
+    store = SQLiteLogStore(str(tmp_path / "logs.db"))
+    store.insert_many(ROWS[:3])
+    _, cursor = store.fetch_after(None)
+    # Committed after the reader paged past it, with an older created_at
+    store.insert_many([dict(ROWS[0], created_at="2026-02-01T09:59:55+00:00", review="late")])
+
+    assert store.fetch_after(cursor)[0] == []
+    rows, _ = store.fetch_after(rewind_cursor(cursor, 10))
+    assert _reviews(rows) == ["late", ROWS[2]["review"]]
+
+
+def test_cache_sync_picks_up_late_rows_once(tmp_path):
+    source = SQLiteLogStore(str(tmp_path / "logs.db"))
+    source.insert_many(ROWS[:3])
+    cache = LocalLogCache(str(tmp_path / "cache.db"))
+    assert cache.sync(source) == 3
+
+    source.insert_many([dict(ROWS[0], created_at="2026-02-01T09:59:55+00:00", review="late")])
+    assert cache.sync(source) == 1
+    assert cache.sync(source) == 0
+    assert cache.row_count() == 4
+
+    assert cache.sync_in_background(source, wait=5) and cache.last_added == 0
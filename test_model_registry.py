@@ -0,0 +1,55 @@
+import model_registry
+from model_registry import ModelRegistry, publish, promote, read_manifest
+
+
+class _FakeModel:
+    pass
+
+
+def _fake_load(version, entry, root):
+    model = _FakeModel()
+    model.model_version = version
+    return model, None
+
+
+def _registry(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(model_registry, "load_version", _fake_load)
+    monkeypatch.setattr(ModelRegistry, "_warm", staticmethod(lambda model, vectorizer: None))
+    for version in ("v1", "v2"):
+        src = tmp_path / f"src_{version}"
+        src.mkdir()
+        (src / "weights.bin").write_bytes(version.encode())
+        publish(str(src), version, root=str(tmp_path / "models"), promote_now=version == "v1")
+    return ModelRegistry(root=str(tmp_path / "models"), **kwargs)
+
+
+def test_publish_and_promote(tmp_path, monkeypatch):
+    registry = _registry(tmp_path, monkeypatch)
+    manifest = read_manifest(str(tmp_path / "models"))
+    assert manifest["current"] == "v1" and set(manifest["versions"]) == {"v1", "v2"}
+    assert (tmp_path / "models" / "v2" / "weights.bin").read_bytes() == b"v2"
+    assert registry.current.version == "v1"
+
+    promote("v2", root=str(tmp_path / "models"))
+    assert registry.refresh() and registry.current.version == "v2"
+
+
+def test_lease_keeps_old_version_until_released(tmp_path, monkeypatch):
+    registry = _registry(tmp_path, monkeypatch)
+    with registry.lease() as handle:
+        promote("v2", root=str(tmp_path / "models"))
+        registry.refresh()
+        assert registry.current.version == "v2"
+        assert handle.model.model_version == "v1"
+        assert registry.info()["retiring"] == {"v1": 1}
+    assert registry.info()["retiring"] == {}
+    assert handle.model is None
+
+
+def test_pin_and_failed_load_keep_serving(tmp_path, monkeypatch):
+    registry = _registry(tmp_path, monkeypatch, pin="v2")
+    assert registry.current.version == "v2"
+
+    registry.pin = "missing"
+    assert not registry.refresh()
+    assert registry.current.version == "v2" and "missing" in registry.last_error
@@ -0,0 +1,89 @@
+import re
+import random
+
+from urdu_text import clean_urdu_text, clean_urdu_texts, split_urdu_sentences
+
+
+def legacy_clean_urdu_text(text):
+    # The original three-pass implementation from backend.py / train_bilstm.py
+    if not isinstance(text, str):
+        text = str(text)
+    text = re.sub(r'[a-zA-Z0-9]', '', text)
+    text = re.sub(r'[^\u0600-\u06FF\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+# Urdu, English, digits (ASCII and Urdu), punctuation, emoji and unusual whitespace
+SAMPLES = [
+    "",
+    "   ",
+    "بہت اچھا",
+    "یہ فلم بہت اچھی ہے",
+    "  یہ بالکل   فضول ہے!!! 100% ",
+    "Great movie بہت زبردست 10/10",
+    "کیا بات ہے؟ واہ۔\nدوسری لائن\t\tتیسری",
+    "قیمت ۱۲۳ روپے، bad",
+    "😍😍 شاندار 👍",
+    "\xa0بہت\u2003اچھا\u3000\u200b",
+    "\x1c\x1d\x1e\x1fالگ\x85",
+    "ﷺ ﻻ ٹھیک",
+    None,
+    12345,
+    3.14,
+]
+
+
+def _random_texts(n=2000, seed=7):
+    rng = random.Random(seed)
+    pools = [
+        [chr(c) for c in range(0x0600, 0x0700)],
+        [chr(c) for c in range(0x20, 0x7F)],
+        [" ", "\t", "\n", "\r", "\x0b", "\x0c", "\x1c", "\x85", "\xa0", "\u2028", "\u3000", "\u200b"],
+        [chr(c) for c in range(0x0700, 0x0800)] + ["ﷲ", "ﻻ", "😀", "\u200c", "\u200d"],
+    ]
+    texts = []
+    for _ in range(n):
+        length = rng.randint(0, 60)
+        texts.append("".join(rng.choice(rng.choice(pools)) for _ in range(length)))
+    return texts
+
+
+def test_matches_legacy_on_samples():
+    for text in SAMPLES:
+        assert clean_urdu_text(text).encode("utf-8") == legacy_clean_urdu_text(text).encode("utf-8"), repr(text)
+
+
+def test_matches_legacy_on_random_text():
+    for text in _random_texts():
+        assert clean_urdu_text(text).encode("utf-8") == legacy_clean_urdu_text(text).encode("utf-8"), repr(text)
+
+
+def test_batch_matches_single():
+    texts = SAMPLES + _random_texts(500)
+    assert clean_urdu_texts(texts) == [legacy_clean_urdu_text(t) for t in texts]
+
+
+def test_batch_keeps_series_index():
+    pd = __import__("pandas")
+    series = pd.Series(["بہت اچھا abc", None, "برا!"], index=[10, 20, 30], name="cleaned_review")
+    out = clean_urdu_texts(series)
+    assert list(out.index) == [10, 20, 30]
+    assert out.name == "cleaned_review"
+    assert list(out) == [legacy_clean_urdu_text(t) for t in series]
+
+
+def test_split_sentences_on_urdu_boundaries():
+    text = "یہ فلم اچھی ہے۔ کیا آپ نے دیکھی؟\r\nبہت بری!! abc\n\n۔۔ 123 ؟"
+    assert split_urdu_sentences(text) == ["یہ فلم اچھی ہے", "کیا آپ نے دیکھی", "بہت بری!! abc"]
+    assert split_urdu_sentences("") == []
+    assert split_urdu_sentences(None) == []
+
+
+if __name__ == "__main__":
+    test_matches_legacy_on_samples()
+    test_matches_legacy_on_random_text()
+    test_batch_matches_single()
+    test_batch_keeps_series_index()
+    test_split_sentences_on_urdu_boundaries()
+    print("clean_urdu_text matches the legacy implementation.")
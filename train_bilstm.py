@@ -1,13 +1,10 @@
-import pandas as pd
-import numpy as np
-import re
+import argparse
+import zlib
 import pickle
-import os
-import tensorflow as tf
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Bidirectional, Dense, Dropout
+
+import numpy as np
+import pandas as pd
+from urdu_text import clean_urdu_texts
 
 # Constants
 DATASET_PATH = "urdu_cleaned_dataset.csv"
@@ -16,81 +13,158 @@ TOKENIZER_PATH = "tokenizer.pkl"
 MAX_LEN = 120
 VOCAB_SIZE = 8000
 EMBEDDING_DIM = 64
+NUM_WORDS = 10000
+
+TEXT_COLUMN = "cleaned_review"
+LABEL_COLUMN = "sentiment"
+LABEL_MAP = {1: 0, 3: 1}  # 1 (Negative) -> 0, 3 (Positive) -> 1
+CHUNK_SIZE = 20000
+
+# Stable split on the cleaned text: 0-9 test, 10-19 validation, the rest training
+TEST_PERCENT = 10
+VAL_PERCENT = 10
+
+# Reviews are batched with others of similar length; shorter buckets get
+# bigger batches so every batch holds roughly TOKENS_PER_BATCH tokens.
+BUCKET_BOUNDARIES = (8, 16, 32, 64)
+TOKENS_PER_BATCH = 8192
+MIN_BATCH, MAX_BATCH = 32, 512
+SHUFFLE_BUFFER = 20000
+
+
+def _split_of(text):
+    bucket = zlib.crc32(text.encode("utf-8")) % 100
+    if bucket < TEST_PERCENT:
+        return "test"
+    if bucket < TEST_PERCENT + VAL_PERCENT:
+        return "val"
+    return "train"
+
+
+def iter_chunks(path=DATASET_PATH, split=None, chunk_size=CHUNK_SIZE):
+    """Yields (cleaned_texts, labels) per CSV chunk, optionally only one split, never holding the whole file."""
+    for chunk in pd.read_csv(path, usecols=[TEXT_COLUMN, LABEL_COLUMN], chunksize=chunk_size):
+        chunk = chunk.dropna(subset=[LABEL_COLUMN])
+        chunk = chunk[chunk[LABEL_COLUMN].isin(list(LABEL_MAP))]
+        texts = clean_urdu_texts(chunk[TEXT_COLUMN].astype(str)).tolist()
+        labels = chunk[LABEL_COLUMN].map(LABEL_MAP).to_numpy(dtype=np.int32)
+        if split is not None:
+            keep = np.array([_split_of(t) == split for t in texts], dtype=bool)
+            texts = [t for t, k in zip(texts, keep) if k]
+            labels = labels[keep]
+        if texts:
+            yield np.array(texts, dtype=object), labels
+
+
+def fit_tokenizer(path=DATASET_PATH, chunk_size=CHUNK_SIZE):
+    """First pass: fits the Keras tokenizer chunk by chunk on the training split."""
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
+    tokenizer = Tokenizer(num_words=NUM_WORDS, oov_token="<OOV>")
+    seen = 0
+    for texts, _ in iter_chunks(path, "train", chunk_size):
+        tokenizer.fit_on_texts(texts)
+        seen += len(texts)
+        print(f"  vocabulary pass: {seen} training reviews, {len(tokenizer.word_index)} words")
+    return tokenizer
+
+
+def _batch_sizes():
+    sizes = [TOKENS_PER_BATCH // b for b in BUCKET_BOUNDARIES + (MAX_LEN,)]
+    return [max(MIN_BATCH, min(MAX_BATCH, s)) for s in sizes]
+
+
+def make_dataset(tokenizer, split, path=DATASET_PATH, chunk_size=CHUNK_SIZE, shuffle=False):
+    """
+    Streams one split from disk as (pre-padded sequences, labels) batches.
+    Tokenization runs in the graph with a lookup table equivalent to
+    tokenizer.texts_to_sequences, so it is parallelized by tf.data.
+    """
+    import tensorflow as tf
+
+    oov = tokenizer.word_index[tokenizer.oov_token]
+    words = [w for w, i in tokenizer.word_index.items() if i < NUM_WORDS and w != tokenizer.oov_token]
+    table = tf.lookup.StaticHashTable(
+        tf.lookup.KeyValueTensorInitializer(
+            tf.constant(words, tf.string),
+            tf.constant([tokenizer.word_index[w] for w in words], tf.int32),
+        ),
+        default_value=oov,
+    )
+
+    def tokenize(texts, labels):
+        # Cleaned text is single-space separated and has none of the Keras filter characters
+        tokens = tf.strings.split(texts, sep=" ")
+        tokens = tf.ragged.boolean_mask(tokens, tf.strings.length(tokens) > 0)
+        ids = tf.ragged.map_flat_values(table.lookup, tokens)
+        return ids[:, -MAX_LEN:], labels  # truncating="pre", like pad_sequences
+
+    ds = tf.data.Dataset.from_generator(
+        lambda: iter_chunks(path, split, chunk_size),
+        output_signature=(tf.TensorSpec((None,), tf.string), tf.TensorSpec((None,), tf.int32)),
+    )
+    ds = ds.map(tokenize, num_parallel_calls=tf.data.AUTOTUNE).unbatch()
+    if shuffle:
+        ds = ds.shuffle(SHUFFLE_BUFFER, reshuffle_each_iteration=True)
+
+    # bucket_by_sequence_length pads at the end; reversing before and after
+    # turns that into the pre-padding the model is served with.
+    ds = ds.map(lambda ids, label: (tf.reverse(ids, [0]), label), num_parallel_calls=tf.data.AUTOTUNE)
+    ds = ds.bucket_by_sequence_length(
+        lambda ids, label: tf.shape(ids)[0],
+        bucket_boundaries=[b + 1 for b in BUCKET_BOUNDARIES],
+        bucket_batch_sizes=_batch_sizes(),
+    )
+    ds = ds.map(lambda ids, labels: (tf.reverse(ids, [1]), labels), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def train_model(path=DATASET_PATH, epochs=5, chunk_size=CHUNK_SIZE):
+    # TensorFlow takes seconds to import; only pay for it when actually training
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Embedding, LSTM, Bidirectional, Dense, Dropout
+
+    # 1. Tokenization (streamed; only the training split is seen)
+    print("Fitting tokenizer...")
+    tokenizer = fit_tokenizer(path, chunk_size)
+
+    # 2. Input pipelines
+    train_ds = make_dataset(tokenizer, "train", path, chunk_size, shuffle=True)
+    val_ds = make_dataset(tokenizer, "val", path, chunk_size)
+    test_ds = make_dataset(tokenizer, "test", path, chunk_size)
 
-def clean_urdu_text(text):
-    if not isinstance(text, str):
-        text = str(text)
-    text = re.sub(r'[a-zA-Z0-9]', '', text)
-    text = re.sub(r'[^\u0600-\u06FF\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def train_model():
-    print("Loading dataset...")
-    df = pd.read_csv(DATASET_PATH)
-    
-    # 1. Prepare Data
-    print("Cleaning text...")
-    df['cleaned_review'] = df['cleaned_review'].astype(str).apply(clean_urdu_text)
-    df = df.dropna(subset=['sentiment'])
-    
-    # Map labels: 1 -> 0 (Negative), 3 -> 1 (Positive)
-    # Ensure we strictly have only these classes
-    print("Filtering and Mapping labels...")
-    df = df[df['sentiment'].isin([1, 3])].copy()
-    
-    # Explicit mapping: 1 (Negative) becomes 0, 3 (Positive) becomes 1
-    label_map = {1: 0, 3: 1}
-    df['label'] = df['sentiment'].map(label_map)
-    
-    X = df['cleaned_review'].values
-    y = df['label'].values
-    
-    print(f"Data shape: {X.shape}, Class distribution: {df['label'].value_counts().to_dict()}")
-
-    # 2. Tokenization
-    print("Tokenizing...")
-    # Increase vocab size slightly for better coverage
-    tokenizer = Tokenizer(num_words=10000, oov_token="<OOV>")
-    tokenizer.fit_on_texts(X)
-    
-    sequences = tokenizer.texts_to_sequences(X)
-    padded_sequences = pad_sequences(sequences, maxlen=MAX_LEN)
-    
     # 3. Model Definition
+    # No input_length: batches are only as long as their length bucket
     print("Building model...")
     model = Sequential([
-        Embedding(input_dim=10000, output_dim=64, input_length=MAX_LEN),
-        Bidirectional(LSTM(64, return_sequences=True)), # Added return_sequences for deeper net or just better flow
+        Embedding(input_dim=NUM_WORDS, output_dim=EMBEDDING_DIM),
+        Bidirectional(LSTM(64, return_sequences=True)),
         Bidirectional(LSTM(32)),
-        Dropout(0.4), # Increased dropout
+        Dropout(0.4),
         Dense(32, activation='relu'),
         Dense(1, activation='sigmoid')
     ])
-    
+    model.build((None, MAX_LEN))
+
     model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
     model.summary()
-    
+
     # 4. Training
     print("Training model...")
-    history = model.fit(
-        padded_sequences, 
-        y, 
-        epochs=5, # Increased epochs
-        batch_size=32, 
-        validation_split=0.2,
-        verbose=1
-    )
-    
-    # 5. Evaluation mechanism (Quick check on training data subset for sanity)
-    # Ideally should use a test split, but using val split from fit is okay for now.
-    # Let's verify manual prediction on examples
+    model.fit(train_ds, validation_data=val_ds, epochs=epochs, verbose=1)
+
+    # 5. Evaluation on the held-out test split
+    print("Evaluating on held-out test split...")
+    loss, accuracy = model.evaluate(test_ds, verbose=0)
+    print(f"Test loss: {loss:.4f}, Test accuracy: {accuracy:.4f}")
+
     print("\nVerifying on test examples...")
     test_texts = ["یہ فلم بہت اچھی ہے", "یہ بہت بیکار ہے"]
-    test_seqs = tokenizer.texts_to_sequences([clean_urdu_text(t) for t in test_texts])
+    test_seqs = tokenizer.texts_to_sequences(clean_urdu_texts(test_texts))
     test_padded = pad_sequences(test_seqs, maxlen=MAX_LEN)
-    preds = model.predict(test_padded)
-    
+    preds = model.predict(test_padded, verbose=0)
+
     for text, pred in zip(test_texts, preds):
         label = "Positive" if pred > 0.5 else "Negative"
         print(f"Text: '{text}' -> Score: {pred[0]:.4f} -> Label: {label}")
@@ -100,11 +174,18 @@ def train_model():
     model.save(MODEL_PATH)
     with open(TOKENIZER_PATH, 'wb') as f:
         pickle.dump(tokenizer, f)
-        
+
     print("Training complete. Model and tokenizer saved.")
+    return model, tokenizer
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming, length-bucketed BiLSTM trainer.")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
     try:
-        train_model()
+        train_model(args.data, args.epochs, args.chunk_size)
     except Exception as e:
         print(f"Training failed: {e}")
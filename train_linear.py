@@ -0,0 +1,152 @@
+import argparse
+import os
+import time
+import zlib
+import pickle
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import classification_report, f1_score
+from sklearn.svm import LinearSVC
+
+from urdu_text import clean_urdu_texts
+from linear_artifact import LINEAR_MODEL_DIR, export_linear_model
+
+# Constants
+DATASET_PATH = "urdu_cleaned_dataset.csv"
+MODEL_PATH = "svm_model.pkl"
+VECTORIZER_PATH = "tfidf_vectorizer.pkl"
+TEXT_COLUMN = "cleaned_review"
+LABEL_COLUMN = "sentiment"
+LABEL_MAP = {1: 0, 3: 1}  # 1 (Negative) -> 0, 3 (Positive) -> 1
+
+# Stable split on the cleaned text: 0-9 test, 10-19 validation, the rest training
+TEST_PERCENT = 10
+VAL_PERCENT = 10
+
+# Search space; every (ngram_range, max_features) pair is one job, C is swept inside it
+NGRAM_RANGES = [(1, 1), (1, 2), (1, 3)]
+MAX_FEATURES = [5000, 20000, 50000]
+C_VALUES = [0.05, 0.1, 0.25, 0.5, 1.0, 2.0]
+
+_data = None  # worker-side (train_texts, y_train, val_texts, y_val)
+
+
+def load_splits(path=DATASET_PATH):
+    """Returns {"train"|"val"|"test": (cleaned_texts, labels)}."""
+    df = pd.read_csv(path, usecols=[TEXT_COLUMN, LABEL_COLUMN])
+    df = df.dropna(subset=[LABEL_COLUMN])
+    df = df[df[LABEL_COLUMN].isin(list(LABEL_MAP))]
+    texts = clean_urdu_texts(df[TEXT_COLUMN].astype(str)).tolist()
+    labels = df[LABEL_COLUMN].map(LABEL_MAP).to_numpy(dtype=np.int64)
+
+    buckets = np.array([zlib.crc32(t.encode("utf-8")) % 100 for t in texts])
+    masks = {
+        "test": buckets < TEST_PERCENT,
+        "val": (buckets >= TEST_PERCENT) & (buckets < TEST_PERCENT + VAL_PERCENT),
+        "train": buckets >= TEST_PERCENT + VAL_PERCENT,
+    }
+    return {
+        name: ([t for t, keep in zip(texts, mask) if keep], labels[mask])
+        for name, mask in masks.items()
+    }
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def _evaluate_config(ngram_range, max_features, c_values):
+    """Fits the vectorizer once and sweeps C on the validation split. Features stay CSR."""
+    train_texts, y_train, val_texts, y_val = _data
+    vectorizer = TfidfVectorizer(ngram_range=ngram_range, max_features=max_features)
+    X_train = vectorizer.fit_transform(train_texts)
+    X_val = vectorizer.transform(val_texts)
+
+    results = []
+    for c in c_values:
+        model = LinearSVC(C=c)
+        model.fit(X_train, y_train)
+        results.append({
+            "ngram_range": ngram_range,
+            "max_features": max_features,
+            "C": c,
+            "val_f1": f1_score(y_val, model.predict(X_val), average="macro"),
+        })
+    return results
+
+
+def search(splits, ngram_ranges=NGRAM_RANGES, max_features=MAX_FEATURES, c_values=C_VALUES, workers=None):
+    """Runs the grid across processes and returns every result, best first."""
+    data = splits["train"] + splits["val"]
+    jobs = list(itertools.product(ngram_ranges, max_features))
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    results = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(_evaluate_config, ngram, mf, c_values) for ngram, mf in jobs]
+        for future in as_completed(futures):
+            for r in future.result():
+                print(f"  ngram={r['ngram_range']} max_features={r['max_features']} C={r['C']}: "
+                      f"val macro-F1 {r['val_f1']:.4f}")
+                results.append(r)
+    # Ties go to the smaller model, so reruns pick the same winner whatever order jobs finish in
+    results.sort(key=lambda r: (-r["val_f1"], r["ngram_range"], r["max_features"], r["C"]))
+    return results
+
+
+def train(path=DATASET_PATH, workers=None, out_dir=LINEAR_MODEL_DIR, ngram_ranges=NGRAM_RANGES,
+          max_features=MAX_FEATURES, c_values=C_VALUES):
+    print("Loading dataset...")
+    splits = load_splits(path)
+    print({name: len(texts) for name, (texts, _) in splits.items()})
+
+    print("Searching hyperparameters...")
+    start = time.perf_counter()
+    results = search(splits, ngram_ranges, max_features, c_values, workers)
+    best = results[0]
+    print(f"Best: ngram={best['ngram_range']} max_features={best['max_features']} C={best['C']} "
+          f"(val macro-F1 {best['val_f1']:.4f}, search took {time.perf_counter() - start:.1f}s)")
+
+    # Refit the winner on train + validation, with calibrated probabilities
+    print("Refitting best configuration with sigmoid calibration...")
+    texts = splits["train"][0] + splits["val"][0]
+    labels = np.concatenate([splits["train"][1], splits["val"][1]])
+    vectorizer = TfidfVectorizer(ngram_range=best["ngram_range"], max_features=best["max_features"])
+    X = vectorizer.fit_transform(texts)
+    model = CalibratedClassifierCV(LinearSVC(C=best["C"]), method="sigmoid", cv=5)
+    model.fit(X, labels)
+
+    test_texts, y_test = splits["test"]
+    if test_texts:
+        print("Held-out test results:")
+        print(classification_report(y_test, model.predict(vectorizer.transform(test_texts)), digits=4))
+
+    with open(MODEL_PATH, "wb") as f:
+        pickle.dump(model, f)
+    with open(VECTORIZER_PATH, "wb") as f:
+        pickle.dump(vectorizer, f)
+    # backend prefers the exported artifact, so keep it in step with the pickles
+    export_linear_model(model, vectorizer, out_dir)
+    print(f"Saved {MODEL_PATH}, {VECTORIZER_PATH} and {out_dir}/.")
+    return model, vectorizer, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TF-IDF + LinearSVC trainer with a parallel grid search.")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--out", default=LINEAR_MODEL_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ngram-max", type=int, nargs="+", default=[n for _, n in NGRAM_RANGES])
+    parser.add_argument("--max-features", type=int, nargs="+", default=MAX_FEATURES)
+    parser.add_argument("--C", type=float, nargs="+", default=C_VALUES, dest="c_values")
+    args = parser.parse_args()
+
+    try:
+        train(args.data, args.workers, args.out, [(1, n) for n in args.ngram_max], args.max_features, args.c_values)
+    except Exception as e:
+        print(f"Training failed: {e}")
@@ -0,0 +1,119 @@
+import argparse
+import zlib
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from urdu_text import clean_urdu_texts
+from linear_artifact import LINEAR_MODEL_DIR, export_linear_model
+
+# Constants
+DATASET_PATH = "urdu_cleaned_dataset.csv"
+TEXT_COLUMN = "cleaned_review"
+LABEL_COLUMN = "sentiment"
+LABEL_MAP = {1: 0, 3: 1}  # 1 (Negative) -> 0, 3 (Positive) -> 1
+CHUNK_SIZE = 50000
+MAX_FEATURES = 5000
+TEST_PERCENT = 10
+
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yields (cleaned_texts, labels, is_test) per CSV chunk, never holding the whole file."""
+    for chunk in pd.read_csv(path, usecols=[TEXT_COLUMN, LABEL_COLUMN], chunksize=chunk_size):
+        chunk = chunk.dropna(subset=[LABEL_COLUMN])
+        chunk = chunk[chunk[LABEL_COLUMN].isin(list(LABEL_MAP))]
+        texts = clean_urdu_texts(chunk[TEXT_COLUMN].astype(str))
+        labels = chunk[LABEL_COLUMN].map(LABEL_MAP).to_numpy(dtype=np.int64)
+        # Stable split on the text itself, so every pass agrees on which rows are held out
+        is_test = np.array([zlib.crc32(t.encode("utf-8")) % 100 < TEST_PERCENT for t in texts], dtype=bool)
+        yield texts.tolist(), labels, is_test
+
+
+def build_vectorizer(path, max_features=MAX_FEATURES, ngram_range=(1, 1), min_df=1, chunk_size=CHUNK_SIZE):
+    """
+    First pass: counts term and document frequencies chunk by chunk and
+    fixes the vocabulary and IDF the same way TfidfVectorizer.fit would
+    (top max_features by corpus frequency, smooth idf).
+    """
+    analyzer = TfidfVectorizer(ngram_range=ngram_range).build_analyzer()
+    term_freq, doc_freq = Counter(), Counter()
+    n_docs = 0
+    for texts, _, is_test in iter_chunks(path, chunk_size):
+        for text, test in zip(texts, is_test):
+            if test:
+                continue
+            terms = analyzer(text)
+            term_freq.update(terms)
+            doc_freq.update(set(terms))
+            n_docs += 1
+        print(f"  vocabulary pass: {n_docs} training documents, {len(term_freq)} distinct terms")
+
+    candidates = [t for t, df in doc_freq.items() if df >= min_df]
+    # Ties broken alphabetically, as in scikit-learn
+    candidates.sort(key=lambda t: (-term_freq[t], t))
+    terms = sorted(candidates[:max_features])
+    vocabulary = {t: i for i, t in enumerate(terms)}
+
+    df = np.array([doc_freq[t] for t in terms], dtype=np.float64)
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, ngram_range=ngram_range)
+    vectorizer.idf_ = np.log((1 + n_docs) / (1 + df)) + 1.0
+    return vectorizer
+
+
+def train_stream(path=DATASET_PATH, out_dir=LINEAR_MODEL_DIR, epochs=3, max_features=MAX_FEATURES,
+                 ngram_range=(1, 1), min_df=1, alpha=1e-5, chunk_size=CHUNK_SIZE):
+    print("Pass 1: building vocabulary...")
+    vectorizer = build_vectorizer(path, max_features, ngram_range, min_df, chunk_size)
+
+    model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=42)
+    rng = np.random.default_rng(42)
+    for epoch in range(epochs):
+        print(f"Pass {epoch + 2}: training epoch {epoch + 1}/{epochs}...")
+        seen = 0
+        for texts, labels, is_test in iter_chunks(path, chunk_size):
+            train_idx = np.flatnonzero(~is_test)
+            if not len(train_idx):
+                continue
+            rng.shuffle(train_idx)
+            X = vectorizer.transform([texts[i] for i in train_idx])
+            model.partial_fit(X, labels[train_idx], classes=np.array([0, 1]))
+            seen += len(train_idx)
+        print(f"  trained on {seen} documents")
+
+    print("Evaluating on held-out split...")
+    correct = total = 0
+    for texts, labels, is_test in iter_chunks(path, chunk_size):
+        test_idx = np.flatnonzero(is_test)
+        if not len(test_idx):
+            continue
+        preds = model.predict(vectorizer.transform([texts[i] for i in test_idx]))
+        correct += int((preds == labels[test_idx]).sum())
+        total += len(test_idx)
+    if total:
+        print(f"Held-out accuracy: {correct / total:.4f} ({total} documents)")
+
+    export_linear_model(model, vectorizer, out_dir)
+    print(f"Model saved to {out_dir}/ (load with backend.initialize_backend).")
+    return model, vectorizer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core TF-IDF + SGD trainer for the linear sentiment model.")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--out", default=LINEAR_MODEL_DIR)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--max-features", type=int, default=MAX_FEATURES)
+    parser.add_argument("--ngram-max", type=int, default=1)
+    parser.add_argument("--min-df", type=int, default=1)
+    parser.add_argument("--alpha", type=float, default=1e-5)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        train_stream(args.data, args.out, args.epochs, args.max_features, (1, args.ngram_max),
+                     args.min_df, args.alpha, args.chunk_size)
+    except Exception as e:
+        print(f"Training failed: {e}")
@@ -0,0 +1,161 @@
+import io
+import os
+import csv
+import time
+import weakref
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+import backend
+from prediction_logger import get_logger
+
+load_dotenv()
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", "1000"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "2"))
+OUTPUT_FIELDS = ["row", "text", "label", "confidence"]
+
+# Shared by every session, so a burst of uploads cannot start unbounded threads
+_executor = ThreadPoolExecutor(UPLOAD_WORKERS, thread_name_prefix="upload-scoring")
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def read_texts(data, filename, text_field=None):
+    """
+    Texts from an uploaded file: one per non-empty line for .txt, the
+    text_field column (default: the first one) for .csv.
+    """
+    content = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if not filename.lower().endswith(".csv"):
+        return [line.strip() for line in content.splitlines() if line.strip()]
+    reader = csv.DictReader(io.StringIO(content, newline=""))
+    text_field = text_field or (reader.fieldnames or [None])[0]
+    return [row.get(text_field) or "" for row in reader]
+
+
+def csv_columns(data):
+    """Header of an uploaded CSV, for picking the text column."""
+    content = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    return next(csv.reader(io.StringIO(content, newline="")), [])
+
+
+class UploadJob:
+    """
+    Scores a list of texts chunk by chunk on the shared worker pool.
+    Every chunk is one predict_sentiment_batch call (bypassing the shared
+    prediction cache, which a large file would only churn); results are
+    appended to a CSV file and, with log=True, written to the log store
+    as one bulk insert. The page polls progress() between reruns. The
+    output file is deleted by discard(), or once the job is garbage
+    collected with its session (or at exit), whichever comes first.
+    Without a model the serving model is leased for the whole run, so a
+    registry hot-swap never mixes two versions in one file.
+    """
+
+    def __init__(self, texts, model=None, vectorizer=None, chunk_size=UPLOAD_CHUNK_SIZE, log=True):
+        self.texts = texts
+        self.model = model
+        self.vectorizer = vectorizer
+        self.chunk_size = chunk_size
+        self.log = log
+        self.output_path = tempfile.NamedTemporaryFile(prefix="scored_", suffix=".csv", delete=False).name
+        self._cleanup = weakref.finalize(self, _remove_file, self.output_path)
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self.rows_done = 0
+        self.label_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
+        self.confidence_sum = 0.0
+        self.started_at = self.finished_at = None
+        self.error = None
+        self.future = None
+
+    def start(self, executor=None):
+        self.future = (executor or _executor).submit(self._run)
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def discard(self):
+        """Stops the job if needed and deletes its output file."""
+        self.cancel()
+        # Still queued behind other sessions' files: drop it without waiting for them.
+        # Running: it stops after the current chunk.
+        if self.future is not None and not self.future.cancel():
+            self.future.result()
+        self._cleanup()
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def progress(self):
+        """Snapshot of the partial results for rendering."""
+        with self._lock:
+            scored = self.rows_done - self.label_counts["Neutral"]
+            elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+            return {
+                "rows_done": self.rows_done,
+                "total": len(self.texts),
+                "fraction": self.rows_done / len(self.texts) if self.texts else 1.0,
+                "labels": dict(self.label_counts),
+                "mean_confidence": self.confidence_sum / scored if scored else 0.0,
+                "rows_per_s": self.rows_done / elapsed if elapsed else 0.0,
+                "done": self.done,
+                "cancelled": self._cancel.is_set(),
+                "error": self.error,
+            }
+
+    def _run(self):
+        self.started_at = time.time()
+        try:
+            if self.model is None:
+                with backend.serving_model() as (model, vectorizer):
+                    self._score(model, vectorizer)
+            else:
+                self._score(self.model, self.vectorizer)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+
+    def _score(self, model, vectorizer):
+        version = backend.model_version_of(model)
+        with open(self.output_path, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(OUTPUT_FIELDS)
+            for start in range(0, len(self.texts), self.chunk_size):
+                if self._cancel.is_set():
+                    break
+                chunk = self.texts[start:start + self.chunk_size]
+                results = backend.predict_sentiment_batch(chunk, model, vectorizer, use_cache=False)
+                writer.writerows(
+                    [start + i, text, label, f"{conf:.6f}"]
+                    for i, (text, (label, conf)) in enumerate(zip(chunk, results))
+                )
+                out.flush()
+                if self.log:
+                    get_logger().write_many(
+                        [(t, l, c) for t, (l, c) in zip(chunk, results) if l != "Neutral"], version
+                    )
+
+                with self._lock:
+                    self.rows_done += len(chunk)
+                    for label, conf in results:
+                        self.label_counts[label] += 1
+                        self.confidence_sum += conf
+
+
+def start_upload_job(texts, model=None, vectorizer=None, log=True):
+    """Queues an UploadJob on the shared pool and returns it."""
+    return UploadJob(texts, model, vectorizer, log=log).start()
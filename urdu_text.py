@@ -0,0 +1,50 @@
+import re
+
+# Everything outside the Arabic/Urdu block (\u0600-\u06FF) and whitespace is dropped.
+# English letters and digits fall outside that block too, so one pattern covers
+# what used to take two passes.
+_DROP_PATTERN = re.compile(r'[^\u0600-\u06FF\s]+')
+_drop = _DROP_PATTERN.sub
+
+# Urdu full stop (\u06D4), Arabic question mark (\u061F) and line breaks end a sentence
+_SENTENCE_END = re.compile(r'[\u06D4\u061F\r\n]+')
+
+
+def clean_urdu_text(text):
+    """
+    Cleans Urdu text by removing English letters, digits, and special chars.
+    Keeps Urdu/Arabic letters and spaces.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    # str.split() and re's \s share the same Unicode whitespace definition,
+    # so split/join is the whitespace normalization and the strip in one step.
+    return " ".join(_drop("", text).split())
+
+
+def clean_urdu_texts(texts):
+    """
+    Cleans many texts at once.
+    Accepts any iterable of texts; a pandas Series comes back as a Series
+    with the same index, everything else as a list.
+    """
+    drop = _drop
+    cleaned = [
+        " ".join(drop("", t if isinstance(t, str) else str(t)).split())
+        for t in texts
+    ]
+    if hasattr(texts, "index") and hasattr(texts, "to_numpy"):
+        import pandas as pd
+        return pd.Series(cleaned, index=texts.index, name=getattr(texts, "name", None), dtype=object)
+    return cleaned
+
+
+def split_urdu_sentences(text):
+    """
+    Splits a paragraph into sentences on Urdu sentence boundaries.
+    Sentences are returned as written (only stripped); ones with nothing
+    left after cleaning are dropped.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    return [s.strip() for s in _SENTENCE_END.split(text) if clean_urdu_text(s)]